@@ -1,39 +1,67 @@
 # Initialize aws_services package
+from collections.abc import Mapping
+from importlib import import_module
+
 from .base_service import BaseAWSService
-from .lambda_service import LambdaService
-from .ec2_service import EC2Service
-from .vpc_service import VPCService
-from .s3_service import S3Service
-from .eks_service import EKSService
-from .opensearch_service import OpenSearchService
-from .elb_service import ELBService
-from .rds_service import RDSService
-from .dynamodb_service import DynamoDBService
-from .sqs_service import SQSService
-from .sns_service import SNSService
-from .apigateway_service import APIGatewayService
-from .cloudwatch_service import CloudWatchService
+from .client_pool import CLIENT_POOL, ClientPool
+from .context import RunContext
+from .accounts import AssumedRoleSessions, list_organization_accounts
 
-# Service registry maps service names to their handler classes
-SERVICE_REGISTRY = {
-    'lambda': LambdaService,
-    'ec2': EC2Service,
-    'vpc': VPCService,
-    's3': S3Service,
-    'eks': EKSService,
-    'elb': ELBService,
-    'opensearch': OpenSearchService,
-    'rds': RDSService,
-    'dynamodb': DynamoDBService,
-    'sqs': SQSService,
-    'sns': SNSService,
-    'apigateway': APIGatewayService,
-    'cloudwatch': CloudWatchService
+# Handler modules are only imported when their service is first looked up,
+# so runs (and Lambda cold starts) only pay for the services they use
+SERVICE_MODULES = {
+    'lambda': ('lambda_service', 'LambdaService'),
+    'ec2': ('ec2_service', 'EC2Service'),
+    'vpc': ('vpc_service', 'VPCService'),
+    's3': ('s3_service', 'S3Service'),
+    'eks': ('eks_service', 'EKSService'),
+    'elb': ('elb_service', 'ELBService'),
+    'opensearch': ('opensearch_service', 'OpenSearchService'),
+    'rds': ('rds_service', 'RDSService'),
+    'dynamodb': ('dynamodb_service', 'DynamoDBService'),
+    'sqs': ('sqs_service', 'SQSService'),
+    'sns': ('sns_service', 'SNSService'),
+    'apigateway': ('apigateway_service', 'APIGatewayService'),
+    'cloudwatch': ('cloudwatch_service', 'CloudWatchService')
 }
 
-def get_service_handler(service_name, session):
+
+class LazyServiceRegistry(Mapping):
+    """Read-only {service_name: handler class} mapping that imports each handler module on first lookup."""
+
+    def __init__(self, modules):
+        self.modules = modules
+        self.classes = {}
+
+    def __getitem__(self, service_name):
+        if service_name not in self.classes:
+            module_name, class_name = self.modules[service_name]
+            module = import_module(f'.{module_name}', __name__)
+            self.classes[service_name] = getattr(module, class_name)
+        return self.classes[service_name]
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def __len__(self):
+        return len(self.modules)
+
+
+# Service registry maps service names to their handler classes
+SERVICE_REGISTRY = LazyServiceRegistry(SERVICE_MODULES)
+
+
+def __getattr__(name):
+    """Keep `from aws_services import LambdaService` working without importing every handler."""
+    for service_name, (_, class_name) in SERVICE_MODULES.items():
+        if class_name == name:
+            return SERVICE_REGISTRY[service_name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_service_handler(service_name, session, context=None):
     """Factory function to get the appropriate service handler."""
     service_class = SERVICE_REGISTRY.get(service_name.lower())
     if not service_class:
         raise ValueError(f"No handler found for service: {service_name}")
-    return service_class(session)
+    return service_class(session, context)
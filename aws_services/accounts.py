@@ -0,0 +1,72 @@
+import threading
+import boto3
+import botocore.session
+from botocore.credentials import DeferredRefreshableCredentials
+
+
+class AssumedRoleSessions:
+    """
+    Creates boto3 sessions for a role assumed in another account.
+
+    The role is assumed once and the credentials are shared by every session
+    handed out (scan workers, per-region sessions and the apply phase).
+    botocore refreshes them shortly before they expire. Nothing is called
+    until a session first signs a request, so creating sessions never fails;
+    an account where the role cannot be assumed raises the AssumeRole
+    ClientError from its first API call instead.
+    """
+
+    def __init__(self, sts_client, account_id, role_name, partition='aws',
+                 session_name='aws-tag-tool', duration_seconds=3600):
+        # The STS client is created by the caller on the main thread; clients
+        # (unlike sessions) are safe to use from the worker threads that refresh
+        self.sts = sts_client
+        self.account_id = account_id
+        self.role_arn = f"arn:{partition}:iam::{account_id}:role/{role_name}"
+        self.session_name = session_name
+        self.duration_seconds = duration_seconds
+        self._credentials = None
+        self._lock = threading.Lock()
+
+    def _fetch_credentials(self):
+        """Call AssumeRole and return the credentials in botocore's refresh format."""
+        credentials = self.sts.assume_role(
+            RoleArn=self.role_arn,
+            RoleSessionName=self.session_name,
+            DurationSeconds=self.duration_seconds
+        )['Credentials']
+        return {
+            'access_key': credentials['AccessKeyId'],
+            'secret_key': credentials['SecretAccessKey'],
+            'token': credentials['SessionToken'],
+            'expiry_time': credentials['Expiration'].isoformat()
+        }
+
+    @property
+    def credentials(self):
+        """The shared refreshable credentials; the role is assumed when they are first used."""
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = DeferredRefreshableCredentials(
+                    refresh_using=self._fetch_credentials,
+                    method='sts-assume-role'
+                )
+            return self._credentials
+
+    def session(self, region=None):
+        """Create a boto3 session in this account, optionally pinned to a region."""
+        botocore_session = botocore.session.Session()
+        botocore_session._credentials = self.credentials
+        if region:
+            botocore_session.set_config_variable('region', region)
+        return boto3.Session(botocore_session=botocore_session)
+
+
+def list_organization_accounts(session):
+    """List the IDs of the active accounts in the caller's AWS Organization."""
+    paginator = session.client('organizations').get_paginator('list_accounts')
+    account_ids = []
+    for page in paginator.paginate():
+        account_ids.extend(account['Id'] for account in page.get('Accounts', [])
+                           if account.get('Status') == 'ACTIVE')
+    return account_ids
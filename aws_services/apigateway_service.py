@@ -1,40 +1,41 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class APIGatewayService(BaseAWSService):
     """Handler for Amazon API Gateway resources."""
+
+    client = PooledClient('apigateway')
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('apigateway')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'apigateway'
     
-    def get_resources(self):
-        """Get all API Gateway REST APIs."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all API Gateway REST APIs."""
         try:
-            # Get all REST APIs
-            apis = self.client.get_rest_apis().get('items', [])
-            
-            for api in apis:
-                api_id = api['id']
-                api_name = api.get('name', f'api-{api_id}')
-                
-                # Get API tags
-                try:
-                    tags = self.client.get_tags(resourceArn=f"arn:aws:apigateway:{self.session.region_name}::/restapis/{api_id}")
-                    tags_dict = tags.get('tags', {})
-                except ClientError as e:
-                    print(f"Error getting tags for API Gateway {api_id}: {e}")
-                    tags_dict = {}
-                
-                resources.append((api_id, api_name, tags_dict))
+            # Get all REST APIs, up to 500 per page
+            for apis in self.iter_pages(self.client, 'get_rest_apis', 'items', PaginationConfig={'PageSize': 500}):
+                # Get API tags concurrently
+                for api, tags_dict in zip(apis, self.map_concurrently(self._get_api_tags, apis)):
+                    api_id = api['id']
+                    api_name = api.get('name', f'api-{api_id}')
+                    yield (api_id, api_name, tags_dict)
                 
         except ClientError as e:
             print(f"Error listing API Gateway REST APIs: {e}")
-            
-        return resources
+    
+    def _get_api_tags(self, api):
+        """Get the tags for a single REST API."""
+        tags = self.lookup_tags(api['id'])
+        if tags is not None:
+            return tags
+        try:
+            tags = self.client.get_tags(resourceArn=self.context.arn('apigateway', f"/restapis/{api['id']}", account_id=''))
+            return tags.get('tags', {})
+        except ClientError as e:
+            print(f"Error getting tags for API Gateway {api['id']}: {e}")
+            return {}
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an API Gateway REST API."""
@@ -42,15 +43,17 @@ class APIGatewayService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            try:
-                existing_tags = self.client.get_tags(
-                    resourceArn=f"arn:aws:apigateway:{self.session.region_name}::/restapis/{resource_id}"
-                ).get('tags', {})
-            except ClientError as e:
-                if e.response['Error']['Code'] != 'NotFoundException':
-                    raise
-                existing_tags = {}
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tags = self.snapshot_tags(resource_id)
+            if existing_tags is None:
+                try:
+                    existing_tags = self.client.get_tags(
+                        resourceArn=self.context.arn('apigateway', f"/restapis/{resource_id}", account_id='')
+                    ).get('tags', {})
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'NotFoundException':
+                        raise
+                    existing_tags = {}
             
             # Only add tags that don't exist
             new_tags = {k: v for k, v in tags.items() if k not in existing_tags}
@@ -60,7 +63,7 @@ class APIGatewayService(BaseAWSService):
                 
             # Add only new tags
             self.client.tag_resource(
-                resourceArn=f"arn:aws:apigateway:{self.session.region_name}::/restapis/{resource_id}",
+                resourceArn=self.context.arn('apigateway', f"/restapis/{resource_id}", account_id=''),
                 tags=new_tags
             )
             return True
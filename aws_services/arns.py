@@ -0,0 +1,50 @@
+"""
+Build ARNs from list-call output and the run context.
+
+Handlers whose list calls only return names or URLs used to describe every
+resource just to read its ARN. These builders return the same ARN locally,
+or None when it cannot be built with certainty (unknown account, unexpected
+URL format), in which case the handler falls back to its describe call.
+"""
+import re
+from urllib.parse import urlparse
+
+ACCOUNT_ID = re.compile(r'^\d{12}$')
+
+
+def _can_build(context):
+    return bool(context.account_id and context.partition and context.region)
+
+
+def dynamodb_table_arn(context, table_name):
+    """arn:{partition}:dynamodb:{region}:{account}:table/{name}"""
+    if not _can_build(context):
+        return None
+    return context.arn('dynamodb', f"table/{table_name}")
+
+
+def sqs_queue_arn(context, queue_url):
+    """
+    arn:{partition}:sqs:{region}:{account}:{name}, with the account and name
+    taken from the queue URL (https://sqs.{region}.amazonaws.com/{account}/{name}).
+    """
+    if not _can_build(context):
+        return None
+    path = urlparse(queue_url).path.strip('/').split('/')
+    if len(path) != 2 or not ACCOUNT_ID.match(path[0]) or not path[1]:
+        return None
+    return context.arn('sqs', path[1], account_id=path[0])
+
+
+def opensearch_domain_arn(context, domain_name):
+    """arn:{partition}:es:{region}:{account}:domain/{name}"""
+    if not _can_build(context):
+        return None
+    return context.arn('es', f"domain/{domain_name}")
+
+
+def eks_cluster_arn(context, cluster_name):
+    """arn:{partition}:eks:{region}:{account}:cluster/{name}"""
+    if not _can_build(context):
+        return None
+    return context.arn('eks', f"cluster/{cluster_name}")
@@ -1,47 +1,252 @@
+import contextvars
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from .context import RunContext
+from .client_pool import CLIENT_POOL, PooledClient
+from .instrumentation import ACCESS_DENIED, API_STATS
+from .rate_limiter import RATE_LIMITER
 
 class BaseAWSService(ABC):
     """Base class for all AWS service handlers."""
+
+    # Upper bound on concurrent per-resource calls (e.g. tag lookups) issued by
+    # map_concurrently. Handlers for APIs with tight rate limits lower this.
+    max_concurrency = 8
+
+    # True for services whose resources are listed from any region (e.g. S3),
+    # so a multi-region run scans them only once
+    is_global = False
+
+    # Maximum number of resources passed to a single apply_tags_batch call
+    batch_size = 20
+
+    # True for handlers whose resource IDs are ARNs, which lets apply_tags_batch
+    # write through the Resource Groups Tagging API when a tag index is loaded
+    arn_resource_ids = False
+
+    # Build ARNs from list output and the run context (see arns) instead of
+    # describing each resource; False always describes (the strict mode)
+    synthesize_arns = True
+
+    # Shared AIMD limiter installed under every client the handler creates
+    rate_limiter = RATE_LIMITER
+
+    # Per-API call statistics (see instrumentation); only installed when enabled
+    api_stats = API_STATS
+
+    # Lets the apply engine stop a service after its first access denied (see instrumentation)
+    access_denied = ACCESS_DENIED
+
+    # Upper bound on concurrent apply batches of this service (see
+    # AWSTaggingTool.apply_changes). Tagging APIs have very different rate limits.
+    apply_concurrency = 4
+
+    # Clients are declared as PooledClient attributes and come from this pool on first use
+    client_pool = CLIENT_POOL
+    client = None
+    resource = None
+    tagging_client = PooledClient('resourcegroupstaggingapi')
     
-    def __init__(self, session):
+    def __init__(self, session, context=None):
         self.session = session
-        self.client = None
-        self.resource = None
+        # Account, partition and region for this run (see context.RunContext)
+        self.context = context or RunContext.from_session(session)
+        # Must run before the handler's clients are created, which copy the session's hooks
+        self.rate_limiter.install(session, self.context)
+        self.api_stats.install(session)
+        self.access_denied.install(session)
+        # Optional {resource_id: tags} index from a bulk scan (see tagging_api)
+        self.tag_index = None
+        # Optional InventoryCache, for lookups worth keeping across runs (see S3Service)
+        self.inventory = None
+        # {resource_id: (tags, fetched_at)} recorded by iter_changes for resources
+        # that need tagging, so apply_tags can skip re-reading tags it has already seen
+        self.tag_snapshot = {}
+        # Seconds after which snapshot tags are re-read before writing (None: never)
+        self.snapshot_max_age = None
     
     @abstractmethod
+    def iter_resources(self):
+        """
+        Yield every resource of this service type, page by page.
+        Each item is a tuple: (resource_id, resource_name, tags_dict)
+        """
+        pass
+
     def get_resources(self):
         """
         Get all resources of this service type.
         Returns a list of tuples: (resource_id, resource_name, tags_dict)
         """
-        pass
+        return list(self.iter_resources())
 
     @abstractmethod
     def apply_tags(self, resource_id, tags):
         """Apply the given tags to the specified resource."""
         pass
     
+    def apply_tags_batch(self, items):
+        """
+        Apply tags to several resources.
+        items is a list of (resource_id, tags) tuples; returns {resource_id: success}.
+
+        The default implementation calls apply_tags once per resource. When a
+        tag index is loaded, handlers with ARN resource IDs write through the
+        tagging API instead, using the scan snapshot as the existence check.
+        Once the service has been denied access, the remaining resources are
+        left out of the results.
+        Handlers whose own APIs accept several resources per call override this.
+        """
+        if self.tag_index is not None and self.arn_resource_ids:
+            return self._apply_tags_via_tagging_api(items)
+        results = {}
+        for resource_id, tags in items:
+            # Resources left out of the results are reported as skipped
+            if self.access_denied.is_denied():
+                break
+            results[resource_id] = self.apply_tags(resource_id, tags)
+        return results
+
+    def group_by_tags(self, items):
+        """
+        Group (resource_id, tags) items that need the exact same tags written.
+        Returns a list of (tags, [resource_id, ...]) in first-seen order.
+        """
+        groups = {}
+        for resource_id, tags in items:
+            groups.setdefault(tuple(sorted(tags.items())), []).append(resource_id)
+        return [(dict(key), resource_ids) for key, resource_ids in groups.items()]
+
+    def _apply_tags_via_tagging_api(self, items):
+        """Write missing tags with resourcegroupstaggingapi tag_resources, 20 ARNs per call."""
+        results = {}
+        pending = []
+        for resource_id, tags in items:
+            existing_tags = self.snapshot_tags(resource_id)
+            if existing_tags is None:
+                results[resource_id] = self.apply_tags(resource_id, tags)
+                continue
+            new_tags = {k: v for k, v in tags.items()
+                        if not k.startswith('aws:') and k not in existing_tags}
+            if new_tags:
+                pending.append((resource_id, new_tags))
+            else:
+                results[resource_id] = True
+
+        for tags, arns in self.group_by_tags(pending):
+            for start in range(0, len(arns), 20):
+                chunk = arns[start:start + 20]
+                try:
+                    failed = self.tagging_client.tag_resources(ResourceARNList=chunk, Tags=tags).get('FailedResourcesMap', {})
+                except ClientError:
+                    failed = chunk
+                for arn in chunk:
+                    # Resources the tagging API rejects go through the handler's own API
+                    results[arn] = self.apply_tags(arn, tags) if arn in failed else True
+
+        return results
+
+    def map_concurrently(self, func, items):
+        """
+        Call func for every item using at most max_concurrency threads.
+        Results are returned in the same order as items.
+        """
+        items = list(items)
+        workers = min(self.max_concurrency, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Run each call in a copy of the caller's context, so API statistics keep their attribution
+            futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+            return [future.result() for future in futures]
+
+    def iter_pages(self, client, operation_name, result_key, **kwargs):
+        """
+        Yield the result_key list of every page of a list call, one list per page.
+
+        The next page is fetched in the background while the caller works on
+        the current one (e.g. its tag lookups), so list and tag latencies
+        overlap. Operations without a botocore paginator are called once.
+        """
+        if client.can_paginate(operation_name):
+            pages = iter(client.get_paginator(operation_name).paginate(**kwargs))
+        else:
+            pages = iter([getattr(client, operation_name)(**kwargs)])
+
+        # One worker: pages are fetched in order, at most one ahead of the caller
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(contextvars.copy_context().run, next, pages, None)
+            while True:
+                page = future.result()
+                if page is None:
+                    return
+                future = executor.submit(contextvars.copy_context().run, next, pages, None)
+                yield page.get(result_key, [])
+
+    def lookup_tags(self, resource_id):
+        """
+        Get the tags for resource_id from the bulk tag index.
+        Returns None when no index is loaded, so callers fetch tags themselves.
+        """
+        if self.tag_index is None:
+            return None
+        return self.tag_index.get(resource_id, {})
+
+    def snapshot_tags(self, resource_id):
+        """
+        Get the scan-time tags for resource_id.
+        Returns None if the resource was not scanned or its snapshot is older
+        than snapshot_max_age, in which case callers read the tags again.
+        """
+        entry = self.tag_snapshot.get(resource_id)
+        if entry is None:
+            return None
+        tags, fetched_at = entry
+        if self.snapshot_max_age is not None and time.time() - fetched_at > self.snapshot_max_age:
+            return None
+        return tags
+
     def get_resource_name(self, resource_id, tags):
         """Get the resource name from tags or generate one."""
         return tags.get('Name', f"{self.service_name}-{resource_id}")
     
-    def process_resources(self):
-        """Process all resources of this service type."""
-        changes = []
-        no_changes = []
-        
+    def iter_changes(self, resources=None, fetched_at=None):
+        """
+        Classify resources as they are scanned.
+        Yields (entry, needs_change) with entry as (SERVICE, resource_id, 'Name', resource_name).
+        Already fetched resources (and the time they were fetched) can be passed
+        in instead of scanning the service. Their tags are only kept as the scan
+        snapshot when fetched_at is given; resources from the inventory cache
+        pass None, so their tags are read again before writing.
+        """
         try:
-            resources = self.get_resources()
+            if resources is None:
+                # Taken before the scan starts so snapshot ages are never underestimated
+                fetched_at = time.time()
+                resources = self.iter_resources()
+            service = self.service_name.upper()
             for resource_id, resource_name, tags in resources:
-                current_name = tags.get('Name', '')
-                
-                if current_name == resource_name:
-                    no_changes.append((self.service_name.upper(), resource_id, 'Name', resource_name))
+                entry = (service, resource_id, 'Name', resource_name)
+                if tags.get('Name', '') == resource_name:
+                    yield entry, False
                 else:
-                    changes.append((self.service_name.upper(), resource_id, 'Name', resource_name))
-                    
+                    if fetched_at is not None:
+                        self.tag_snapshot[resource_id] = (tags, fetched_at)
+                    yield entry, True
+
         except ClientError as e:
             print(f"Error processing {self.service_name} resources: {e}")
-            
+
+    def process_resources(self, resources=None, fetched_at=None):
+        """
+        Process all resources of this service type.
+        Returns (changes, no_changes) lists built from iter_changes.
+        """
+        changes = []
+        no_changes = []
+        for entry, needs_change in self.iter_changes(resources, fetched_at):
+            (changes if needs_change else no_changes).append(entry)
         return changes, no_changes
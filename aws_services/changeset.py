@@ -0,0 +1,83 @@
+import sys
+
+
+class ChangeGroup:
+    """
+    The changes for one resource type in one region, stored column by column.
+
+    Keeping resource IDs, tag keys and tag values in parallel lists costs three
+    pointers per resource, instead of a tuple (and a fresh copy of the service
+    and region strings) per change.
+    """
+
+    __slots__ = ('service', 'region', 'resource_ids', 'tag_keys', 'tag_values')
+
+    def __init__(self, service, region):
+        self.service = service
+        self.region = region
+        self.resource_ids = []
+        self.tag_keys = []
+        self.tag_values = []
+
+    def add(self, resource_id, tag_key, tag_value):
+        self.resource_ids.append(resource_id)
+        # Interned, so every change shares the same 'Name' key string
+        self.tag_keys.append(sys.intern(tag_key))
+        self.tag_values.append(tag_value)
+
+    def __len__(self):
+        return len(self.resource_ids)
+
+    def __iter__(self):
+        """Yield (resource_id, tag_key, tag_value) in insertion order."""
+        return zip(self.resource_ids, self.tag_keys, self.tag_values)
+
+    def batches(self, size):
+        """Yield lists of at most size (resource_id, tag_key, tag_value) tuples."""
+        for start in range(0, len(self), size):
+            end = start + size
+            yield list(zip(self.resource_ids[start:end], self.tag_keys[start:end], self.tag_values[start:end]))
+
+
+class ChangeSet:
+    """
+    Changes (or already-correct entries) indexed by resource type and region.
+
+    Groups are created as entries are added, so preview, apply and export can
+    walk ``groups`` directly instead of regrouping a flat list.
+    """
+
+    def __init__(self):
+        # {(SERVICE, region): ChangeGroup}, in the order groups were first seen
+        self.groups = {}
+
+    def add(self, service, resource_id, tag_key, tag_value, region):
+        """Record one change."""
+        key = (service, region)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = ChangeGroup(sys.intern(service), sys.intern(region))
+        group.add(resource_id, tag_key, tag_value)
+
+    def update(self, other):
+        """Append the groups of another change set, merging groups with the same key."""
+        for key, group in other.groups.items():
+            if key not in self.groups:
+                self.groups[key] = group
+                continue
+            target = self.groups[key]
+            target.resource_ids.extend(group.resource_ids)
+            target.tag_keys.extend(group.tag_keys)
+            target.tag_values.extend(group.tag_values)
+
+    def __len__(self):
+        return sum(len(group) for group in self.groups.values())
+
+    def __bool__(self):
+        return any(self.groups.values())
+
+    def __iter__(self):
+        """Yield (SERVICE, resource_id, tag_key, tag_value, region) for every change, group by group."""
+        for group in self.groups.values():
+            for resource_id, tag_key, tag_value in group:
+                yield group.service, resource_id, tag_key, tag_value, group.region
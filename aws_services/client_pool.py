@@ -0,0 +1,98 @@
+import threading
+
+from botocore.credentials import RefreshableCredentials
+
+
+def credentials_key(credentials):
+    """
+    Hashable identity of a session's credentials.
+
+    Refreshable credentials (assumed roles, instance profiles, SSO) are keyed by
+    object, since their keys rotate while the clients built on them stay valid;
+    static credentials by value, so independent sessions resolved from the same
+    environment or profile share clients.
+    """
+    if credentials is None:
+        return None
+    if isinstance(credentials, RefreshableCredentials):
+        return ('refreshable', id(credentials))
+    return ('static', credentials.access_key, credentials.secret_key, credentials.token)
+
+
+class ClientPool:
+    """
+    Process-wide pool of boto3 clients keyed by (service, region, credentials).
+
+    Creating a client is the most expensive part of building a handler, and
+    several handlers use the same clients (EC2 and VPC both use 'ec2'; every
+    handler may write through 'resourcegroupstaggingapi'). Clients are created
+    on first use and shared afterwards, across handlers, worker threads and
+    runs in the same process (e.g. warm Lambda invocations). boto3 clients are
+    thread-safe once created; sessions and resources are not, so those are
+    never pooled.
+
+    A pooled client keeps the event hooks of the session it was created from
+    (rate limiter, API statistics). Call clear() before reusing the pool with
+    sessions whose hooks must not be shared.
+    """
+
+    def __init__(self):
+        self.clients = {}
+        # Keeps refreshable credentials alive while their id() is part of a key
+        self.credentials = {}
+        self.lock = threading.Lock()
+
+    def client(self, session, service_name, region_name=None):
+        """
+        Get (creating it from session on first use) the client for service_name
+        in region_name, by default the session's region.
+        """
+        region_name = region_name or session.region_name
+        credentials = session.get_credentials()
+        key = (service_name, region_name, credentials_key(credentials))
+        client = self.clients.get(key)
+        if client is not None:
+            return client
+        with self.lock:
+            client = self.clients.get(key)
+            if client is None:
+                client = self.clients[key] = session.client(service_name, region_name=region_name)
+                if isinstance(credentials, RefreshableCredentials):
+                    self.credentials[id(credentials)] = credentials
+            return client
+
+    def clear(self):
+        """Drop every pooled client."""
+        with self.lock:
+            self.clients.clear()
+            self.credentials.clear()
+
+
+class PooledClient:
+    """
+    Handler attribute resolving to the pooled client for a service, on first access.
+
+        class SQSService(BaseAWSService):
+            client = PooledClient('sqs')
+
+    The client comes from the handler's client_pool for its session and is then
+    cached on the handler, so handlers that never call an API never create its client.
+    """
+
+    def __init__(self, service_name):
+        self.service_name = service_name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, handler, owner=None):
+        if handler is None:
+            return self
+        client = handler.client_pool.client(handler.session, self.service_name)
+        # Instance attribute from now on; this descriptor is not consulted again
+        handler.__dict__[self.name] = client
+        return client
+
+
+# Shared by every handler (and every session) in the process
+CLIENT_POOL = ClientPool()
@@ -1,58 +1,71 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class CloudWatchService(BaseAWSService):
     """Handler for Amazon CloudWatch resources."""
+
+    client = PooledClient('cloudwatch')
+    logs_client = PooledClient('logs')  # For CloudWatch Logs
+
+    # CloudWatch Logs tag APIs have low per-account rate limits
+    max_concurrency = 4
+    apply_concurrency = 2
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('cloudwatch')
-        self.logs_client = session.client('logs')  # For CloudWatch Logs
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'cloudwatch'
     
-    def get_resources(self):
-        """Get all CloudWatch Alarms and Log Groups."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all CloudWatch Alarms and Log Groups."""
         try:
             # Get all CloudWatch Alarms
-            paginator = self.client.get_paginator('describe_alarms')
-            for page in paginator.paginate():
-                for alarm in page.get('MetricAlarms', []):
-                    alarm_arn = alarm['AlarmArn']
-                    alarm_name = alarm['AlarmName']
-                    
-                    # Get alarm tags
-                    try:
-                        tags = self.client.list_tags_for_resource(ResourceARN=alarm_arn).get('Tags', [])
-                        tags_dict = {tag['Key']: tag['Value'] for tag in tags}
-                    except ClientError as e:
-                        print(f"Error getting tags for CloudWatch Alarm {alarm_name}: {e}")
-                        tags_dict = {}
-                    
-                    resources.append((alarm_arn, alarm_name, tags_dict))
+            for alarms in self.iter_pages(self.client, 'describe_alarms', 'MetricAlarms'):
+                for alarm, tags_dict in zip(alarms, self.map_concurrently(self._get_alarm_tags, alarms)):
+                    yield (alarm['AlarmArn'], alarm['AlarmName'], tags_dict)
             
             # Get all CloudWatch Log Groups
-            log_paginator = self.logs_client.get_paginator('describe_log_groups')
-            for page in log_paginator.paginate():
-                for log_group in page.get('logGroups', []):
+            for log_groups in self.iter_pages(self.logs_client, 'describe_log_groups', 'logGroups'):
+                for log_group, tags_dict in zip(log_groups, self.map_concurrently(self._get_log_group_tags, log_groups)):
                     log_group_name = log_group['logGroupName']
-                    log_group_arn = f"arn:aws:logs:{self.session.region_name}:{self.session.client('sts').get_caller_identity().get('Account')}:log-group:{log_group_name}"
-                    
-                    # Get log group tags
-                    try:
-                        tags = self.logs_client.list_tags_log_group(logGroupName=log_group_name).get('tags', {})
-                        tags_dict = {k: str(v) for k, v in tags.items()}
-                    except ClientError as e:
-                        print(f"Error getting tags for CloudWatch Log Group {log_group_name}: {e}")
-                        tags_dict = {}
-                    
-                    resources.append((log_group_arn, log_group_name, tags_dict))
+                    log_group_arn = self._get_log_group_arn(log_group)
+                    yield (log_group_arn, log_group_name, tags_dict)
                     
         except ClientError as e:
             print(f"Error listing CloudWatch resources: {e}")
-            
-        return resources
+    
+    def _get_log_group_arn(self, log_group):
+        """Get a log group's ARN (without the trailing ':*'), building it only if the API omitted it."""
+        if log_group.get('logGroupArn'):
+            return log_group['logGroupArn']
+        if log_group.get('arn'):
+            return log_group['arn'][:-2] if log_group['arn'].endswith(':*') else log_group['arn']
+        return self.context.arn('logs', f"log-group:{log_group['logGroupName']}")
+    
+    def _get_alarm_tags(self, alarm):
+        """Get the tags for a single CloudWatch Alarm."""
+        tags = self.lookup_tags(alarm['AlarmArn'])
+        if tags is not None:
+            return tags
+        try:
+            tags = self.client.list_tags_for_resource(ResourceARN=alarm['AlarmArn']).get('Tags', [])
+            return {tag['Key']: tag['Value'] for tag in tags}
+        except ClientError as e:
+            print(f"Error getting tags for CloudWatch Alarm {alarm['AlarmName']}: {e}")
+            return {}
+    
+    def _get_log_group_tags(self, log_group):
+        """Get the tags for a single CloudWatch Log Group."""
+        tags = self.lookup_tags(self._get_log_group_arn(log_group))
+        if tags is not None:
+            return tags
+        try:
+            tags = self.logs_client.list_tags_log_group(logGroupName=log_group['logGroupName']).get('tags', {})
+            return {k: str(v) for k, v in tags.items()}
+        except ClientError as e:
+            print(f"Error getting tags for CloudWatch Log Group {log_group['logGroupName']}: {e}")
+            return {}
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to a CloudWatch resource (Alarm or Log Group)."""
@@ -63,9 +76,11 @@ class CloudWatchService(BaseAWSService):
             if ':alarm:' in resource_id:
                 # Handle CloudWatch Alarm
                 try:
-                    # Get existing tags
-                    existing_tags = self.client.list_tags_for_resource(ResourceARN=resource_id).get('Tags', [])
-                    existing_tag_keys = {tag['Key'] for tag in existing_tags}
+                    # Get existing tags, reusing the ones seen during the scan
+                    existing_tag_keys = self.snapshot_tags(resource_id)
+                    if existing_tag_keys is None:
+                        existing_tags = self.client.list_tags_for_resource(ResourceARN=resource_id).get('Tags', [])
+                        existing_tag_keys = {tag['Key'] for tag in existing_tags}
                     
                     # Only add tags that don't exist
                     new_tags = [{'Key': k, 'Value': v} 
@@ -90,9 +105,11 @@ class CloudWatchService(BaseAWSService):
                 # Handle CloudWatch Log Group
                 log_group_name = resource_id.split(':log-group:')[-1].rstrip(':*')
                 
-                # Get existing tags
+                # Get existing tags, reusing the ones seen during the scan
                 try:
-                    existing_tags = self.logs_client.list_tags_log_group(logGroupName=log_group_name).get('tags', {})
+                    existing_tags = self.snapshot_tags(resource_id)
+                    if existing_tags is None:
+                        existing_tags = self.logs_client.list_tags_log_group(logGroupName=log_group_name).get('tags', {})
                     
                     # Only add tags that don't exist
                     new_tags = {k: str(v) for k, v in tags.items() if k not in existing_tags}
@@ -0,0 +1,37 @@
+class RunContext:
+    """
+    Account, partition and region shared by every handler in a run.
+
+    Resolved once (one STS call) and passed to the handlers so they can build
+    ARNs locally instead of asking STS for the account on every resource.
+    """
+
+    def __init__(self, account_id, region, partition='aws', caller_arn=None):
+        self.account_id = account_id
+        self.region = region
+        self.partition = partition
+        self.caller_arn = caller_arn
+
+    @classmethod
+    def from_identity(cls, identity, region):
+        """Build a context from a get_caller_identity response."""
+        caller_arn = identity.get('Arn', '')
+        partition = caller_arn.split(':')[1] if caller_arn.count(':') >= 5 else 'aws'
+        return cls(identity.get('Account'), region, partition, caller_arn)
+
+    @classmethod
+    def from_session(cls, session):
+        """Build a context by calling STS with the given session."""
+        return cls.from_identity(session.client('sts').get_caller_identity(), session.region_name)
+
+    def for_region(self, region):
+        """Return a copy of this context for another region of the same account."""
+        if region == self.region:
+            return self
+        return RunContext(self.account_id, region, self.partition, self.caller_arn)
+
+    def arn(self, service, resource, region=None, account_id=None):
+        """Build an ARN in this run's partition, defaulting to its region and account."""
+        region = self.region if region is None else region
+        account_id = self.account_id if account_id is None else account_id
+        return f"arn:{self.partition}:{service}:{region}:{account_id}:{resource}"
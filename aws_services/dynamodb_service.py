@@ -1,36 +1,47 @@
 from botocore.exceptions import ClientError
+from .arns import dynamodb_table_arn
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class DynamoDBService(BaseAWSService):
     """Handler for Amazon DynamoDB resources."""
+
+    client = PooledClient('dynamodb')
+
+    # DynamoDB control-plane calls (including tag_resource) are limited per account
+    apply_concurrency = 2
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('dynamodb')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'dynamodb'
     
-    def get_resources(self):
-        """Get all DynamoDB tables."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all DynamoDB tables."""
         try:
             # Get all tables
-            paginator = self.client.get_paginator('list_tables')
-            for page in paginator.paginate():
-                for table_name in page.get('TableNames', []):
-                    try:
-                        table_info = self.client.describe_table(TableName=table_name)['Table']
-                        arn = table_info['TableArn']
-                        tags = self.client.list_tags_of_resource(ResourceArn=arn).get('Tags', [])
-                        tags_dict = {tag['Key']: tag['Value'] for tag in tags}
-                        resources.append((arn, table_name, tags_dict))
-                    except ClientError as e:
-                        print(f"Error getting info for DynamoDB table {table_name}: {e}")
+            for table_names in self.iter_pages(self.client, 'list_tables', 'TableNames'):
+                for resource in self.map_concurrently(self._get_table, table_names):
+                    if resource:
+                        yield resource
                         
         except ClientError as e:
             print(f"Error listing DynamoDB tables: {e}")
-            
-        return resources
+    
+    def _get_table(self, table_name):
+        """Get the (arn, name, tags) tuple for a single table, or None on error."""
+        try:
+            arn = dynamodb_table_arn(self.context, table_name) if self.synthesize_arns else None
+            if arn is None:
+                arn = self.client.describe_table(TableName=table_name)['Table']['TableArn']
+            tags_dict = self.lookup_tags(arn)
+            if tags_dict is None:
+                tags = self.client.list_tags_of_resource(ResourceArn=arn).get('Tags', [])
+                tags_dict = {tag['Key']: tag['Value'] for tag in tags}
+            return (arn, table_name, tags_dict)
+        except ClientError as e:
+            print(f"Error getting info for DynamoDB table {table_name}: {e}")
+            return None
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to a DynamoDB table."""
@@ -38,9 +49,11 @@ class DynamoDBService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            existing_tags = self.client.list_tags_of_resource(ResourceArn=resource_id).get('Tags', [])
-            existing_tag_keys = {tag['Key'] for tag in existing_tags}
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tag_keys = self.snapshot_tags(resource_id)
+            if existing_tag_keys is None:
+                existing_tags = self.client.list_tags_of_resource(ResourceArn=resource_id).get('Tags', [])
+                existing_tag_keys = {tag['Key'] for tag in existing_tags}
             
             # Only add tags that don't exist
             new_tags = [{'Key': k, 'Value': v} 
@@ -1,61 +1,211 @@
+import threading
+import time
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
+
+# EC2-family resource types (describe_tags resource-type values) covered by EC2NameIndex
+NAME_INDEX_RESOURCE_TYPES = (
+    'instance', 'vpc', 'subnet', 'security-group', 'network-interface', 'volume', 'snapshot',
+    'image', 'internet-gateway', 'natgateway', 'route-table', 'network-acl', 'elastic-ip',
+    'vpc-endpoint', 'vpc-peering-connection', 'launch-template', 'dhcp-options',
+    'customer-gateway', 'vpn-gateway', 'vpn-connection', 'key-pair', 'placement-group',
+)
+
+class EC2NameIndex:
+    """
+    Region-wide {resource_id: Name tag} index of EC2-family resources.
+
+    Built with one paginated describe_tags sweep filtered on key=Name and
+    NAME_INDEX_RESOURCE_TYPES, and shared by every EC2-family handler of the
+    same account and region in the process, so the EC2 and VPC scans (and any
+    EC2-family type added later) cost one sweep between them instead of
+    per-resource tag calls. Resources missing from the index have no Name tag.
+    Only scans read it: writes check the tags of the resources they write
+    (see existing_tag_keys).
+    """
+
+    # {(account_id, region): EC2NameIndex}
+    indexes = {}
+    indexes_lock = threading.Lock()
+
+    def __init__(self):
+        self.names = {}
+        self.fetched_at = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_handler(cls, handler):
+        """Get (creating it on first use) the index for the handler's account and region."""
+        key = (handler.context.account_id, handler.context.region)
+        with cls.indexes_lock:
+            if key not in cls.indexes:
+                cls.indexes[key] = cls()
+            return cls.indexes[key]
+
+    def get(self, client, max_age=None):
+        """
+        Return {resource_id: name}, sweeping again when the index is older
+        than max_age seconds (None: reuse it however old).
+        Raises ClientError if the sweep fails.
+        """
+        with self.lock:
+            if self.fetched_at is None or (max_age is not None and time.time() - self.fetched_at > max_age):
+                fetched_at = time.time()
+                paginator = client.get_paginator('describe_tags')
+                pages = paginator.paginate(Filters=[
+                    {'Name': 'key', 'Values': ['Name']},
+                    {'Name': 'resource-type', 'Values': list(NAME_INDEX_RESOURCE_TYPES)}
+                ], PaginationConfig={'PageSize': 1000})
+                self.names = dict(pages.search('Tags[].[ResourceId, Value]'))
+                self.fetched_at = fetched_at
+            return self.names
+
+    def record(self, resource_ids, name):
+        """Record Name tags written since the sweep."""
+        with self.lock:
+            for resource_id in resource_ids:
+                self.names[resource_id] = name
+
+def existing_tag_keys(handler, resource_ids, keys):
+    """
+    Return the (resource_id, key) pairs among keys that resource_ids already have.
+
+    Keys a fresh scan snapshot already shows are trusted, since nothing is
+    written for them. Resources that may still need a key are checked right
+    before writing with describe_tags filtered to their IDs (one call per 200),
+    so a tag set since the scan, or since the Name index was swept, is never
+    overwritten.
+    """
+    existing = set()
+    unknown = []
+    for resource_id in resource_ids:
+        found = {k for k in handler.snapshot_tags(resource_id) or {} if k in keys}
+        existing.update((resource_id, k) for k in found)
+        if len(found) < len(keys):
+            unknown.append(resource_id)
+    if not unknown:
+        return existing
+
+    paginator = handler.client.get_paginator('describe_tags')
+    for start in range(0, len(unknown), 200):
+        for page in paginator.paginate(Filters=[
+            {'Name': 'resource-id', 'Values': unknown[start:start + 200]},
+            {'Name': 'key', 'Values': sorted(keys)}
+        ]):
+            existing.update((tag['ResourceId'], tag['Key']) for tag in page.get('Tags', []))
+    return existing
+
+def create_tags(handler, resource_ids, tags):
+    """Call create_tags and record any Name written in the shared index."""
+    handler.client.create_tags(
+        Resources=resource_ids,
+        Tags=[{'Key': k, 'Value': v} for k, v in tags.items()]
+    )
+    if 'Name' in tags:
+        EC2NameIndex.for_handler(handler).record(resource_ids, tags['Name'])
+
+def create_tags_batch(handler, items):
+    """
+    Apply tags to many EC2-family resources (instances, VPCs, ...) with at
+    most one tag lookup and one create_tags call per distinct tag set.
+    Returns {resource_id: success}.
+    """
+    items = [(resource_id, {k: v for k, v in tags.items() if not k.startswith('aws:')})
+             for resource_id, tags in items]
+    keys = {k for _, tags in items for k in tags}
+    
+    try:
+        existing = existing_tag_keys(handler, [resource_id for resource_id, _ in items], keys)
+    except ClientError as e:
+        print(f"Error reading {handler.service_name.upper()} tags, tagging one by one: {e}")
+        return {resource_id: handler.apply_tags(resource_id, tags) for resource_id, tags in items}
+    
+    results = {}
+    pending = []
+    for resource_id, tags in items:
+        new_tags = {k: v for k, v in tags.items() if (resource_id, k) not in existing}
+        if new_tags:
+            pending.append((resource_id, new_tags))
+        else:
+            results[resource_id] = True
+    
+    for tags, resource_ids in handler.group_by_tags(pending):
+        try:
+            create_tags(handler, resource_ids, tags)
+            results.update(dict.fromkeys(resource_ids, True))
+        except ClientError:
+            # A single bad resource fails the whole call; retry one by one so
+            # each failure is reported against its own resource
+            for resource_id in resource_ids:
+                results[resource_id] = handler.apply_tags(resource_id, tags)
+    
+    return results
 
 class EC2Service(BaseAWSService):
     """Handler for AWS EC2 instances."""
+
+    client = PooledClient('ec2')
+
+    # describe_tags accepts up to 200 values per filter
+    batch_size = 200
+
+    # describe_instances returns at most 1000 instances per page
+    page_size = 1000
+
+    # Seconds a Name index swept by another EC2-family scan is reused for
+    # this one (see EC2NameIndex)
+    name_index_ttl = 60
+
+    # Instance states to scan (e.g. ['pending', 'running', 'stopping', 'stopped']),
+    # filtered server-side; None scans every state
+    instance_states = None
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('ec2')
-        self.resource = session.resource('ec2')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'ec2'
     
-    def get_resources(self):
-        """Get all EC2 instances."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all EC2 instances."""
         try:
-            instances = self.resource.instances.all()
+            # Name tags come from the region's shared index; the listing only provides IDs
+            names = EC2NameIndex.for_handler(self).get(self.client, self.name_index_ttl)
+            filters = []
+            if self.instance_states:
+                filters.append({'Name': 'instance-state-name', 'Values': list(self.instance_states)})
             
-            for instance in instances:
-                instance_id = instance.id
-                tags = {tag['Key']: tag['Value'] for tag in instance.tags or []}
-                
-                # Use the Name tag if it exists, otherwise use the instance ID
-                instance_name = tags.get('Name', f"ec2-{instance_id}")
-                
-                resources.append((instance_id, instance_name, tags))
+            for reservations in self.iter_pages(self.client, 'describe_instances', 'Reservations', Filters=filters,
+                                                PaginationConfig={'PageSize': self.page_size}):
+                for instance_id in (instance['InstanceId'] for reservation in reservations
+                                    for instance in reservation.get('Instances', [])):
+                    tags = {'Name': names[instance_id]} if instance_id in names else {}
+                    
+                    # Use the Name tag if it exists, otherwise use the instance ID
+                    instance_name = tags.get('Name', f"ec2-{instance_id}")
+                    
+                    yield (instance_id, instance_name, tags)
                 
         except ClientError as e:
             print(f"Error listing EC2 instances: {e}")
-            
-        return resources
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an EC2 instance."""
         try:
             # Skip AWS reserved tags and tags that already exist
-            existing_tags = self.client.describe_tags(
-                Filters=[
-                    {'Name': 'resource-id', 'Values': [resource_id]},
-                    {'Name': 'key', 'Values': list(tags.keys())}
-                ]
-            )
-            
-            # Get tags that don't exist yet
-            existing_tag_keys = {tag['Key'] for tag in existing_tags.get('Tags', [])}
-            new_tags = [{'Key': k, 'Value': v} 
-                      for k, v in tags.items() 
-                      if k not in existing_tag_keys and not k.startswith('aws:')]
+            tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
+            existing = existing_tag_keys(self, [resource_id], set(tags))
+            new_tags = {k: v for k, v in tags.items() if (resource_id, k) not in existing}
             
             if not new_tags:
                 return True
                 
-            self.client.create_tags(
-                Resources=[resource_id],
-                Tags=new_tags
-            )
+            create_tags(self, [resource_id], new_tags)
             return True
             
         except ClientError as e:
             print(f"Error tagging EC2 instance {resource_id}: {e}")
+            return False
+    
+    def apply_tags_batch(self, items):
+        """Apply tags to many EC2 instances."""
+        return create_tags_batch(self, items)
@@ -1,35 +1,48 @@
 from botocore.exceptions import ClientError
+from .arns import eks_cluster_arn
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class EKSService(BaseAWSService):
     """Handler for Amazon EKS resources."""
+
+    client = PooledClient('eks')
+
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('eks')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'eks'
     
-    def get_resources(self):
-        """Get all EKS clusters."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all EKS clusters."""
         try:
-            # List all EKS clusters
-            clusters = self.client.list_clusters()
-            
-            # Get details for each cluster
-            for cluster_name in clusters.get('clusters', []):
-                try:
-                    cluster = self.client.describe_cluster(name=cluster_name)['cluster']
-                    tags = cluster.get('tags', {})
-                    resources.append((cluster['arn'], cluster['name'], tags))
-                except ClientError as e:
-                    print(f"Error describing EKS cluster {cluster_name}: {e}")
+            # List all EKS clusters, up to 100 per page
+            for cluster_names in self.iter_pages(self.client, 'list_clusters', 'clusters',
+                                                 PaginationConfig={'PageSize': 100}):
+                # Get details for each cluster concurrently
+                for resource in self.map_concurrently(self._get_cluster, cluster_names):
+                    if resource:
+                        yield resource
                     
         except ClientError as e:
             print(f"Error listing EKS clusters: {e}")
-            
-        return resources
+    
+    def _get_cluster(self, cluster_name):
+        """Get the (arn, name, tags) tuple for a single cluster, or None on error."""
+        try:
+            # A built ARN only saves a call when the bulk tag index has the tags:
+            # otherwise describe_cluster returns the ARN and the tags in one call
+            arn = eks_cluster_arn(self.context, cluster_name) if self.synthesize_arns else None
+            if arn is not None:
+                tags = self.lookup_tags(arn)
+                if tags is not None:
+                    return (arn, cluster_name, tags)
+            cluster = self.client.describe_cluster(name=cluster_name)['cluster']
+            return (cluster['arn'], cluster['name'], cluster.get('tags', {}))
+        except ClientError as e:
+            print(f"Error describing EKS cluster {cluster_name}: {e}")
+            return None
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an EKS cluster."""
@@ -37,9 +50,10 @@ class EKSService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            cluster_name = resource_id.split('/')[-1]
-            existing_tags = self.client.describe_cluster(name=cluster_name)['cluster'].get('tags', {})
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tags = self.snapshot_tags(resource_id)
+            if existing_tags is None:
+                existing_tags = self.client.list_tags_for_resource(resourceArn=resource_id).get('tags', {})
             
             # Only add tags that don't exist
             new_tags = {k: v for k, v in tags.items() if k not in existing_tags}
@@ -1,64 +1,100 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class ELBService(BaseAWSService):
-    """Handler for AWS Elastic Load Balancing resources."""
+    """Handler for AWS Elastic Load Balancing resources (load balancers and target groups)."""
+
+    elbv2 = PooledClient('elbv2')  # For Application and Network Load Balancers and target groups
+    elb = PooledClient('elb')      # For Classic Load Balancers
+
+    # describe_tags and add_tags accept up to 20 resources per call
+    batch_size = 20
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.elbv2 = session.client('elbv2')  # For Application and Network Load Balancers
-        self.elb = session.client('elb')      # For Classic Load Balancers
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'elb'
     
-    def get_resources(self):
-        """Get all load balancers (Application, Network, and Classic)."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all load balancers (Application, Network, and Classic) and target groups."""
         try:
             # Get Application and Network Load Balancers (v2 API)
-            paginator = self.elbv2.get_paginator('describe_load_balancers')
-            for page in paginator.paginate():
-                for lb in page.get('LoadBalancers', []):
-                    arn = lb['LoadBalancerArn']
-                    name = lb['LoadBalancerName']
-                    tags_response = self.elbv2.describe_tags(ResourceArns=[arn])
-                    tags = {}
-                    if 'TagDescriptions' in tags_response and tags_response['TagDescriptions']:
-                        tags = {tag['Key']: tag['Value'] for tag in tags_response['TagDescriptions'][0].get('Tags', [])}
-                    resources.append((arn, name, tags))
+            for lbs in self.iter_pages(self.elbv2, 'describe_load_balancers', 'LoadBalancers'):
+                arns = [lb['LoadBalancerArn'] for lb in lbs]
+                tags = self._get_tags_in_batches(arns)
+                for lb, arn in zip(lbs, arns):
+                    yield (arn, lb['LoadBalancerName'], tags.get(arn, {}))
+            
+            # Get target groups, which share the v2 tag APIs
+            for target_groups in self.iter_pages(self.elbv2, 'describe_target_groups', 'TargetGroups'):
+                arns = [target_group['TargetGroupArn'] for target_group in target_groups]
+                tags = self._get_tags_in_batches(arns)
+                for target_group, arn in zip(target_groups, arns):
+                    yield (arn, target_group['TargetGroupName'], tags.get(arn, {}))
             
             # Get Classic Load Balancers
-            classic_lbs = self.elb.describe_load_balancers()
-            for lb in classic_lbs.get('LoadBalancerDescriptions', []):
-                name = lb['LoadBalancerName']
-                try:
-                    tags_response = self.elb.describe_tags(LoadBalancerNames=[name])
-                    tags = {}
-                    if 'TagDescriptions' in tags_response and tags_response['TagDescriptions']:
-                        tags = {tag['Key']: tag['Value'] for tag in tags_response['TagDescriptions'][0].get('Tags', [])}
-                    resources.append((f"classic/{name}", name, tags))
-                except ClientError as e:
-                    print(f"Error getting tags for Classic Load Balancer {name}: {e}")
+            for classic_lbs in self.iter_pages(self.elb, 'describe_load_balancers', 'LoadBalancerDescriptions'):
+                resource_ids = [f"classic/{lb['LoadBalancerName']}" for lb in classic_lbs]
+                tags = self._get_tags_in_batches(resource_ids)
+                for resource_id in resource_ids:
+                    # Load balancers whose tags could not be read are skipped
+                    if resource_id in tags:
+                        yield (resource_id, resource_id.split('/', 1)[1], tags[resource_id])
                     
         except ClientError as e:
             print(f"Error listing load balancers: {e}")
-            
-        return resources
+    
+    def _get_tags_in_batches(self, resource_ids):
+        """
+        Get {resource_id: tags_dict} for one page of resources of a single kind.
+        Tags come from the bulk tag index when one is loaded, otherwise from
+        describe_tags calls of 20 resources each, run concurrently.
+        """
+        tags = {}
+        unknown = []
+        for resource_id in resource_ids:
+            indexed = self.lookup_tags(resource_id)
+            if indexed is None:
+                unknown.append(resource_id)
+            else:
+                tags[resource_id] = indexed
+        batches = [unknown[start:start + self.batch_size] for start in range(0, len(unknown), self.batch_size)]
+        for batch_tags in self.map_concurrently(self._get_batch_tags, batches):
+            tags.update(batch_tags)
+        return tags
+    
+    def _get_batch_tags(self, resource_ids):
+        """Get the tags of up to 20 resources of a single kind, falling back to one call per Classic Load Balancer."""
+        try:
+            return self._describe_tags_batch(resource_ids)
+        except ClientError:
+            if not resource_ids[0].startswith('classic/'):
+                raise
+            # One missing Classic Load Balancer fails the whole call; read them one by one
+            tags = {}
+            for resource_id in resource_ids:
+                try:
+                    tags.update(self._describe_tags_batch([resource_id]))
+                except ClientError as e:
+                    print(f"Error getting tags for Classic Load Balancer {resource_id.split('/', 1)[1]}: {e}")
+            return tags
     
     def apply_tags(self, resource_id, tags):
-        """Apply tags to a load balancer."""
+        """Apply tags to a load balancer or target group."""
         try:
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            if resource_id.startswith('classif'):
+            if resource_id.startswith('classic/'):
                 # Handle Classic Load Balancer
                 lb_name = resource_id.split('/')[1]
-                # Get existing tags
-                existing_tags = self.elb.describe_tags(LoadBalancerNames=[lb_name])
-                existing_tags_dict = {}
-                if 'TagDescriptions' in existing_tags and existing_tags['TagDescriptions']:
-                    existing_tags_dict = {tag['Key']: tag['Value'] for tag in existing_tags['TagDescriptions'][0].get('Tags', [])}
+                # Get existing tags, reusing the ones seen during the scan
+                existing_tags_dict = self.snapshot_tags(resource_id)
+                if existing_tags_dict is None:
+                    existing_tags = self.elb.describe_tags(LoadBalancerNames=[lb_name])
+                    existing_tags_dict = {}
+                    if 'TagDescriptions' in existing_tags and existing_tags['TagDescriptions']:
+                        existing_tags_dict = {tag['Key']: tag['Value'] for tag in existing_tags['TagDescriptions'][0].get('Tags', [])}
                 
                 # Only add tags that don't exist
                 new_tags = {k: v for k, v in tags.items() if k not in existing_tags_dict}
@@ -75,12 +111,14 @@ class ELBService(BaseAWSService):
                     Tags=tag_list
                 )
             else:
-                # Handle Application/Network Load Balancer (v2)
-                # Get existing tags
-                existing_tags = self.elbv2.describe_tags(ResourceArns=[resource_id])
-                existing_tags_dict = {}
-                if 'TagDescriptions' in existing_tags and existing_tags['TagDescriptions']:
-                    existing_tags_dict = {tag['Key']: tag['Value'] for tag in existing_tags['TagDescriptions'][0].get('Tags', [])}
+                # Handle Application/Network Load Balancer or target group (v2)
+                # Get existing tags, reusing the ones seen during the scan
+                existing_tags_dict = self.snapshot_tags(resource_id)
+                if existing_tags_dict is None:
+                    existing_tags = self.elbv2.describe_tags(ResourceArns=[resource_id])
+                    existing_tags_dict = {}
+                    if 'TagDescriptions' in existing_tags and existing_tags['TagDescriptions']:
+                        existing_tags_dict = {tag['Key']: tag['Value'] for tag in existing_tags['TagDescriptions'][0].get('Tags', [])}
                 
                 # Only add tags that don't exist
                 new_tags = {k: v for k, v in tags.items() if k not in existing_tags_dict}
@@ -102,3 +140,74 @@ class ELBService(BaseAWSService):
         except ClientError as e:
             print(f"Error tagging load balancer {resource_id}: {e}")
             return False
+    
+    def apply_tags_batch(self, items):
+        """Apply tags to up to 20 load balancers or target groups with batched describe_tags/add_tags calls."""
+        items = [(resource_id, {k: v for k, v in tags.items() if not k.startswith('aws:')})
+                 for resource_id, tags in items]
+        
+        # Reuse the tags seen during the scan; only resources without a usable
+        # snapshot are read, with one describe_tags call per kind for the whole batch
+        existing_tags = {}
+        unknown = []
+        for resource_id, _ in items:
+            snapshot = self.snapshot_tags(resource_id)
+            if snapshot is None:
+                unknown.append(resource_id)
+            else:
+                existing_tags[resource_id] = snapshot
+        try:
+            existing_tags.update(self._describe_tags_batch(unknown))
+        except ClientError as e:
+            print(f"Error reading load balancer tags, tagging one by one: {e}")
+            return {resource_id: self.apply_tags(resource_id, tags) for resource_id, tags in items}
+        
+        results = {}
+        pending = []
+        for resource_id, tags in items:
+            new_tags = {k: v for k, v in tags.items() if k not in existing_tags.get(resource_id, {})}
+            if new_tags:
+                pending.append((resource_id, new_tags))
+            else:
+                results[resource_id] = True
+        
+        for tags, resource_ids in self.group_by_tags(pending):
+            tag_list = [{'Key': k, 'Value': v} for k, v in tags.items()]
+            arns, classic_ids = self._split_ids(resource_ids)
+            calls = []
+            if arns:
+                calls.append((arns, self.elbv2.add_tags, {'ResourceArns': arns}))
+            if classic_ids:
+                names = [resource_id.split('/', 1)[1] for resource_id in classic_ids]
+                calls.append((classic_ids, self.elb.add_tags, {'LoadBalancerNames': names}))
+            
+            for batch, add_tags, targets in calls:
+                try:
+                    add_tags(Tags=tag_list, **targets)
+                    results.update(dict.fromkeys(batch, True))
+                except ClientError:
+                    # One bad load balancer fails the whole call; retry one by one
+                    # so each failure is reported against its own resource
+                    for resource_id in batch:
+                        results[resource_id] = self.apply_tags(resource_id, tags)
+        
+        return results
+    
+    def _split_ids(self, resource_ids):
+        """Split resource IDs into (v2 ARNs, classic resource IDs)."""
+        arns = [resource_id for resource_id in resource_ids if not resource_id.startswith('classic/')]
+        classic_ids = [resource_id for resource_id in resource_ids if resource_id.startswith('classic/')]
+        return arns, classic_ids
+    
+    def _describe_tags_batch(self, resource_ids):
+        """Get {resource_id: tags_dict} for up to 20 v2 resources and up to 20 Classic Load Balancers."""
+        arns, classic_ids = self._split_ids(resource_ids)
+        tags = {}
+        if arns:
+            for description in self.elbv2.describe_tags(ResourceArns=arns).get('TagDescriptions', []):
+                tags[description['ResourceArn']] = {tag['Key']: tag['Value'] for tag in description.get('Tags', [])}
+        if classic_ids:
+            names = [resource_id.split('/', 1)[1] for resource_id in classic_ids]
+            for description in self.elb.describe_tags(LoadBalancerNames=names).get('TagDescriptions', []):
+                tags[f"classic/{description['LoadBalancerName']}"] = {tag['Key']: tag['Value'] for tag in description.get('Tags', [])}
+        return tags
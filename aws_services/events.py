@@ -0,0 +1,213 @@
+"""
+Resources created according to CloudTrail events.
+
+Events come from an SQS queue (an EventBridge rule forwarding "AWS API Call
+via CloudTrail" events, directly or through SNS) or from a JSONL file. Each
+supported API call is turned into the (resource_id, resource_name, tags)
+tuple the handler's iter_resources would yield for the new resource, so
+events can be classified and applied like scan results. The tags are the
+ones passed at creation; handlers read the current tags again before
+writing.
+"""
+import json
+import time
+from urllib.parse import urlparse
+
+from .arns import sqs_queue_arn
+
+
+def _tag_list(tags, key='key', value='value'):
+    """{key: value} from a CloudTrail [{key, value}] tag list."""
+    return {tag[key]: tag.get(value, '') for tag in tags or [] if key in tag}
+
+
+def _lambda_function(context, request, response):
+    return [(response['functionArn'], response['functionName'], dict(request.get('tags') or {}))]
+
+
+def _s3_bucket(context, request, response):
+    return [(request['bucketName'], request['bucketName'], {})]
+
+
+def _ec2_instances(context, request, response):
+    tags = {}
+    for spec in (request.get('tagSpecificationSet') or {}).get('items', []):
+        if spec.get('resourceType') == 'instance':
+            tags.update(_tag_list(spec.get('tags')))
+    resources = []
+    for instance in (response.get('instancesSet') or {}).get('items', []):
+        instance_id = instance['instanceId']
+        resources.append((instance_id, tags.get('Name', f"ec2-{instance_id}"), tags))
+    return resources
+
+
+def _log_group(context, request, response):
+    name = request['logGroupName']
+    return [(context.arn('logs', f"log-group:{name}"), name, dict(request.get('tags') or {}))]
+
+
+def _sqs_queue(context, request, response):
+    arn = sqs_queue_arn(context, response['queueUrl'])
+    if arn is None:
+        return []
+    return [(arn, response['queueUrl'].split('/')[-1], dict(request.get('tags') or {}))]
+
+
+def _dynamodb_table(context, request, response):
+    table = response['tableDescription']
+    return [(table['tableArn'], table['tableName'], _tag_list(request.get('tags')))]
+
+
+def _sns_topic(context, request, response):
+    return [(response['topicArn'], response['topicArn'].split(':')[-1], _tag_list(request.get('tags')))]
+
+
+# {eventName: (service_name, builder)}; builders take (context, requestParameters,
+# responseElements) and return the created resources as iter_resources yields them
+EVENT_RESOURCES = {
+    'CreateFunction20150331': ('lambda', _lambda_function),
+    'CreateFunction': ('lambda', _lambda_function),
+    'CreateBucket': ('s3', _s3_bucket),
+    'RunInstances': ('ec2', _ec2_instances),
+    'CreateLogGroup': ('cloudwatch', _log_group),
+    'CreateQueue': ('sqs', _sqs_queue),
+    'CreateTable': ('dynamodb', _dynamodb_table),
+    'CreateTopic': ('sns', _sns_topic),
+}
+
+
+def parse_event(event):
+    """
+    Normalize an EventBridge event wrapping a CloudTrail record, or a bare
+    CloudTrail record, to (account_id, region, event_name, request, response).
+    Returns None for anything else, including failed calls.
+    """
+    detail = event.get('detail', event)
+    if not isinstance(detail, dict) or 'eventName' not in detail or detail.get('errorCode'):
+        return None
+    account_id = detail.get('recipientAccountId') or event.get('account')
+    region = detail.get('awsRegion') or event.get('region')
+    return (account_id, region, detail['eventName'],
+            detail.get('requestParameters') or {}, detail.get('responseElements') or {})
+
+
+def created_resources(event, context):
+    """
+    The resources an event created, as (service_name, region, (resource_id, resource_name, tags)).
+    context is the run context of the account being tagged, made regional here.
+    Events of other accounts, for unsupported API calls, or missing the fields
+    needed yield nothing.
+    """
+    parsed = parse_event(event)
+    if parsed is None or parsed[2] not in EVENT_RESOURCES:
+        return []
+    account_id, region, event_name, request, response = parsed
+    if account_id != context.account_id or not region:
+        return []
+    service_name, builder = EVENT_RESOURCES[event_name]
+    try:
+        resources = builder(context.for_region(region), request, response)
+    except (KeyError, TypeError, AttributeError):
+        return []
+    return [(service_name, region, resource) for resource in resources]
+
+
+def queue_region(queue_url):
+    """The region in an SQS queue URL (https://sqs.{region}.amazonaws.com/...), or None."""
+    host = urlparse(queue_url).hostname or ''
+    parts = host.split('.')
+    if parts[0] == 'sqs' and len(parts) > 2:
+        return parts[1]
+    if len(parts) > 2 and parts[1] == 'queue':
+        # Legacy {region}.queue.amazonaws.com
+        return parts[0]
+    return None
+
+
+def _unwrap(body):
+    """The event in an SQS message body, unwrapping SNS notifications."""
+    message = json.loads(body)
+    if isinstance(message, dict) and message.get('Type') == 'Notification' and 'Message' in message:
+        message = json.loads(message['Message'])
+    return message
+
+
+class SQSEventSource:
+    """
+    Events from an SQS queue, received with long polling.
+
+    Messages are only deleted (ack) once their events have been handled; if
+    the daemon dies first, SQS delivers them again after the visibility timeout.
+    """
+
+    def __init__(self, client, queue_url, wait_time=20):
+        self.client = client
+        self.queue_url = queue_url
+        self.wait_time = wait_time
+
+    def receive(self, wait_time=None):
+        """Return [(event, receipt)] for up to 10 messages, waiting up to wait_time seconds for the first."""
+        response = self.client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=self.wait_time if wait_time is None else int(wait_time),
+        )
+        events = []
+        for message in response.get('Messages', []):
+            try:
+                event = _unwrap(message['Body'])
+            except ValueError:
+                # Not an event; acknowledged so it is not received over and over
+                event = None
+            events.append((event, message['ReceiptHandle']))
+        return events
+
+    def ack(self, receipts):
+        """Delete handled messages, 10 per call."""
+        for start in range(0, len(receipts), 10):
+            entries = [{'Id': str(index), 'ReceiptHandle': receipt}
+                       for index, receipt in enumerate(receipts[start:start + 10])]
+            self.client.delete_message_batch(QueueUrl=self.queue_url, Entries=entries)
+
+
+class FileEventSource:
+    """
+    Events from a JSONL file, one event per line (e.g. recorded from EventBridge).
+
+    Lines appended while the daemon runs are picked up, like tail -f.
+    """
+
+    def __init__(self, path, poll_interval=1.0):
+        self.file = open(path)
+        self.poll_interval = poll_interval
+        self.line_number = 0
+        self.partial = ''
+
+    def receive(self, wait_time=None):
+        """Return [(event, None)] for the lines read, waiting up to wait_time seconds for the first."""
+        deadline = time.monotonic() + (wait_time or 0)
+        while True:
+            events = []
+            for line in self.file:
+                line, self.partial = self.partial + line, ''
+                try:
+                    event = json.loads(line) if line.strip() else None
+                except ValueError:
+                    if not line.endswith('\n'):
+                        # Still being written; parsed once the rest has been appended
+                        self.partial = line
+                        continue
+                    print(f"Skipping invalid event on line {self.line_number + 1}")
+                    event = None
+                self.line_number += 1
+                if event is not None:
+                    events.append((event, None))
+            if events or time.monotonic() >= deadline:
+                return events
+            time.sleep(self.poll_interval)
+
+    def ack(self, receipts):
+        """Nothing to acknowledge in a file."""
+
+    def close(self):
+        self.file.close()
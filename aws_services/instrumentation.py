@@ -0,0 +1,203 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from .rate_limiter import THROTTLING_ERROR_CODES
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Error codes AWS services use when IAM (or an SCP) denies a call
+ACCESS_DENIED_ERROR_CODES = {
+    'AccessDenied',
+    'AccessDeniedException',
+    'UnauthorizedOperation',
+    'AuthorizationError',
+    'AuthorizationErrorException',
+}
+
+# (handler, phase) that issues the calls made in the current context
+CURRENT_CALLER = contextvars.ContextVar('api_caller', default=('tool', 'setup'))
+
+
+class ApiCallStats:
+    """Counters and a latency histogram for one API, as called by one handler in one phase."""
+
+    __slots__ = ('calls', 'retries', 'throttles', 'errors', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.throttles = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, latency_ms, attempt, error_code, status_code):
+        self.calls += 1
+        if attempt > 1:
+            self.retries += 1
+        if error_code in THROTTLING_ERROR_CODES or status_code == 429:
+            self.throttles += 1
+        elif error_code is not None or status_code is None or status_code >= 400:
+            self.errors += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, fraction):
+        """
+        Estimate the latency below which the given fraction of calls fall.
+
+        Calls are assumed to be spread evenly within the histogram bucket holding
+        that fraction, from its lower bound to its upper bound (max_ms for the
+        open bucket, and at most max_ms for any bucket).
+        """
+        target = fraction * self.calls
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.buckets):
+            upper = min(LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms, self.max_ms)
+            if count and seen + count >= target:
+                return round(lower + (upper - lower) * (target - seen) / count, 2)
+            seen += count
+            lower = upper
+        return 0.0
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'retries': self.retries,
+            'throttles': self.throttles,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max_ms, 2),
+            'histogram_ms': dict(zip([str(bound) for bound in LATENCY_BUCKETS_MS] + ['inf'], self.buckets)),
+        }
+
+
+class ApiStats:
+    """
+    Per-API call statistics collected through botocore's event system.
+
+    Every HTTP attempt is timed from before-send to needs-retry and attributed
+    to the (handler, phase) set with track(). Nothing is installed while the
+    collector is disabled, so disabled runs only pay for the track() calls.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}
+        self.lock = threading.Lock()
+        # Attempt start times; before-send and needs-retry run on the same thread
+        self.local = threading.local()
+
+    @contextmanager
+    def track(self, handler, phase):
+        """Attribute the calls made inside the block (and map_concurrently workers) to handler and phase."""
+        token = CURRENT_CALLER.set((handler, phase))
+        try:
+            yield
+        finally:
+            CURRENT_CALLER.reset(token)
+
+    def install(self, session):
+        """Time the calls of every client created from session from now on; a no-op when disabled."""
+        if not self.enabled:
+            return
+        events = session.events
+        events.register('before-send', self._before_send, unique_id='tag-tool-api-stats-send')
+        events.register('needs-retry', self._needs_retry, unique_id='tag-tool-api-stats-retry')
+
+    def _before_send(self, **kwargs):
+        self.local.started = time.perf_counter()
+
+    def _needs_retry(self, event_name, response=None, attempts=1, **kwargs):
+        started = getattr(self.local, 'started', None)
+        if started is None:
+            return None
+        self.local.started = None
+        latency_ms = (time.perf_counter() - started) * 1000
+        error_code = status_code = None
+        if response is not None:
+            http_response, parsed = response
+            status_code = http_response.status_code
+            if isinstance(parsed, dict):
+                error_code = parsed.get('Error', {}).get('Code')
+
+        handler, phase = CURRENT_CALLER.get()
+        key = (phase, handler, event_name.split('.', 1)[1])
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = ApiCallStats()
+            stats.record(latency_ms, attempts, error_code, status_code)
+        return None
+
+    def report(self):
+        """List {phase, handler, api, ...counters} dicts, sorted by phase, handler and API."""
+        with self.lock:
+            items = sorted(self.stats.items())
+        return [dict(phase=phase, handler=handler, api=api, **stats.to_dict())
+                for (phase, handler, api), stats in items]
+
+
+class AccessDeniedMonitor:
+    """
+    Remembers the handlers that were denied access while applying tags.
+
+    Always installed (it only looks at the error code of each response), so the
+    apply engine can stop sending a service's batches after its first denial
+    instead of failing every remaining resource one call at a time. Denials are
+    only recorded inside scope(), so concurrent accounts never see each other's.
+    """
+
+    def __init__(self):
+        # {handler: error message} of the current scope, None outside any scope
+        self.current = contextvars.ContextVar('access_denied', default=None)
+
+    @property
+    def denied(self):
+        return self.current.get() or {}
+
+    @contextmanager
+    def scope(self):
+        """Record the denials of the block (and of workers running in a copy of its context) afresh."""
+        token = self.current.set({})
+        try:
+            yield
+        finally:
+            self.current.reset(token)
+
+    def install(self, session):
+        """Watch the calls of every client created from session from now on."""
+        session.events.register('needs-retry', self._needs_retry, unique_id='tag-tool-access-denied')
+
+    def _needs_retry(self, response=None, **kwargs):
+        denied = self.current.get()
+        if denied is None or response is None or not isinstance(response[1], dict):
+            return None
+        error = response[1].get('Error', {})
+        if error.get('Code') in ACCESS_DENIED_ERROR_CODES:
+            handler, phase = CURRENT_CALLER.get()
+            if phase == 'apply':
+                denied.setdefault(handler, error.get('Message') or error['Code'])
+        return None
+
+    def is_denied(self):
+        """True once the handler issuing calls in the current context has been denied access."""
+        return CURRENT_CALLER.get()[0] in self.denied
+
+
+# Shared by every handler (and every session) in the process
+API_STATS = ApiStats()
+ACCESS_DENIED = AccessDeniedMonitor()
@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def default_cache_dir():
+    """The tool's cache directory, following XDG_CACHE_HOME when it is set."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'aws-tag-tool')
+
+
+class InventoryCache:
+    """
+    On-disk (SQLite) inventory of scanned resources.
+
+    One entry per (account, region, service) holds the handler's get_resources
+    output and the time it was fetched. Entries younger than ttl seconds are
+    served instead of scanning the service again. A single instance can be
+    shared by several tools and worker threads.
+
+    It also keeps the region of resources that live in one region but are
+    listed from anywhere (S3 buckets), which does not expire.
+    """
+
+    def __init__(self, path, ttl=900):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS scans ('
+                'account_id TEXT, region TEXT, service TEXT, fetched_at REAL, '
+                'PRIMARY KEY (account_id, region, service))'
+            )
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS resources ('
+                'account_id TEXT, region TEXT, service TEXT, resource_id TEXT, name TEXT, tags TEXT, '
+                'PRIMARY KEY (account_id, region, service, resource_id))'
+            )
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS resource_regions ('
+                'account_id TEXT, service TEXT, resource_id TEXT, region TEXT, '
+                'PRIMARY KEY (account_id, service, resource_id))'
+            )
+
+    def load(self, account_id, region, service):
+        """
+        Get a fresh cached scan.
+        Returns (resources, fetched_at), with resources as get_resources returns
+        them, or None when nothing is cached or the entry is older than ttl.
+        """
+        key = (account_id, region, service)
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT fetched_at FROM scans WHERE account_id = ? AND region = ? AND service = ?', key
+            ).fetchone()
+            if row is None or time.time() - row[0] > self.ttl:
+                return None
+            rows = self.connection.execute(
+                'SELECT resource_id, name, tags FROM resources '
+                'WHERE account_id = ? AND region = ? AND service = ? ORDER BY rowid', key
+            ).fetchall()
+        return [(resource_id, name, json.loads(tags)) for resource_id, name, tags in rows], row[0]
+
+    def store(self, account_id, region, service, resources, fetched_at):
+        """Replace the cached scan of a service with a fresh get_resources result."""
+        key = (account_id, region, service)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'DELETE FROM resources WHERE account_id = ? AND region = ? AND service = ?', key
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?)',
+                [key + (resource_id, name, json.dumps(tags)) for resource_id, name, tags in resources]
+            )
+            self.connection.execute('INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?)', key + (fetched_at,))
+
+    def invalidate(self, account_id, region, service, resource_ids):
+        """
+        Drop cached resources whose tags have changed.
+        The service's scan is dropped too, so the next run rescans it.
+        """
+        key = (account_id, region, service)
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'DELETE FROM resources WHERE account_id = ? AND region = ? AND service = ? AND resource_id = ?',
+                [key + (resource_id,) for resource_id in resource_ids]
+            )
+            self.connection.execute(
+                'DELETE FROM scans WHERE account_id = ? AND region = ? AND service = ?', key
+            )
+
+    def load_regions(self, account_id, service):
+        """Get the known {resource_id: region} of a service's resources."""
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT resource_id, region FROM resource_regions WHERE account_id = ? AND service = ?',
+                (account_id, service)
+            ).fetchall()
+        return dict(rows)
+
+    def store_regions(self, account_id, service, regions):
+        """Record the region of resources, given as {resource_id: region}."""
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO resource_regions VALUES (?, ?, ?, ?)',
+                [(account_id, service, resource_id, region) for resource_id, region in regions.items()]
+            )
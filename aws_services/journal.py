@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+
+from .changeset import ChangeSet
+
+# Outcome recorded for a change that needs no further attempt
+APPLIED = 'applied'
+
+
+class ApplyJournal:
+    """
+    Append-only record of an apply run, so an interrupted run can be resumed
+    without scanning again.
+
+    Every line is a compact JSON array:
+
+        ["c", id, account, region, service, resource_id, tag_key, tag_value]
+        ["o", id, outcome]
+
+    A change ("c") is written once, before its first attempt; every attempt
+    appends its outcome ("o": applied, failed or skipped) and the last one
+    wins. Writes are buffered and synced every sync_every records or
+    sync_interval seconds, so a crash loses at most that much progress: those
+    changes are simply attempted again on resume. A last line the crash left
+    half-written is cut off when the journal is opened again.
+
+    Safe to share between the tools of a multi-account run.
+    """
+
+    def __init__(self, path, sync_every=1000, sync_interval=1.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        # {(account, region, service, resource_id, tag_key): id}
+        self.ids = {}
+        # {id: (account, region, service, resource_id, tag_key, tag_value)}
+        self.changes = {}
+        # {id: last outcome}
+        self.outcomes = {}
+        self._drop_partial_line()
+        self._read()
+        self.file = open(path, 'a')
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def _read(self):
+        """Load the changes and outcomes of an existing journal; raises ValueError if a line is invalid."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            lines = f.read().split('\n')
+        for line_number, line in enumerate(lines, 1):
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if record[0] == 'c':
+                    change_id, change = record[1], tuple(record[2:8])
+                    if len(change) != 6:
+                        raise ValueError(f"expected 8 fields, got {len(record)}")
+                    self.changes[change_id] = change
+                    self.ids[change[:5]] = change_id
+                elif record[0] == 'o':
+                    self.outcomes[record[1]] = record[2]
+                else:
+                    raise ValueError(f"unknown record type {record[0]!r}")
+            except (IndexError, TypeError, ValueError) as e:
+                raise ValueError(f"{self.path}:{line_number}: invalid journal entry ({e})")
+
+    def _drop_partial_line(self):
+        """Truncate the journal after its last complete line, cutting off a line a crash left unterminated."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            end = position = f.seek(0, os.SEEK_END)
+            keep = 0
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline != -1:
+                    keep = start + newline + 1
+                    break
+                position = start
+            if keep < end:
+                f.truncate(keep)
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.unsynced += 1
+        if self.unsynced >= self.sync_every or time.monotonic() - self.synced_at >= self.sync_interval:
+            self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def _id(self, account_id, region, service, resource_id, tag_key, tag_value):
+        """Id of a change, writing it on first sight; the caller holds the lock."""
+        key = (account_id, region, service, resource_id, tag_key)
+        change_id = self.ids.get(key)
+        if change_id is None:
+            change_id = self.ids[key] = len(self.changes)
+            self.changes[change_id] = key + (tag_value,)
+            self._write(['c', change_id, *key, tag_value])
+        return change_id
+
+    def add(self, account_id, changes):
+        """Journal every change of a ChangeSet not journaled yet, and sync before they are attempted."""
+        with self.lock:
+            for service, resource_id, tag_key, tag_value, region in changes:
+                self._id(account_id, region, service.lower(), resource_id, tag_key, tag_value)
+            self._sync()
+
+    def record(self, account_id, region, service, resource_id, tag_key, tag_value, outcome):
+        """Append the outcome of one change."""
+        with self.lock:
+            change_id = self._id(account_id, region, service.lower(), resource_id, tag_key, tag_value)
+            self.outcomes[change_id] = outcome
+            self._write(['o', change_id, outcome])
+
+    def pending(self):
+        """
+        The changes still to attempt: never attempted, failed or skipped.
+        Returns ({account_id: ChangeSet}, applied), where applied counts the changes left out.
+        """
+        plan = {}
+        applied = 0
+        with self.lock:
+            for change_id, (account_id, region, service, resource_id, tag_key, tag_value) in self.changes.items():
+                if self.outcomes.get(change_id) == APPLIED:
+                    applied += 1
+                    continue
+                plan.setdefault(account_id, ChangeSet()).add(service.upper(), resource_id, tag_key, tag_value, region)
+        return plan, applied
+
+    def sync(self):
+        """Write every buffered record to disk."""
+        with self.lock:
+            self._sync()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self._sync()
+                self.file.close()
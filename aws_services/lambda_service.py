@@ -1,43 +1,46 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class LambdaService(BaseAWSService):
     """Handler for AWS Lambda resources."""
+
+    client = PooledClient('lambda')
+
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('lambda')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'lambda'
     
-    def get_resources(self):
-        """Get all Lambda functions."""
-        resources = []
-
+    def iter_resources(self):
+        """Yield all Lambda functions."""
         try:
-            paginator = self.client.get_paginator('list_functions')
-            for page in paginator.paginate():
-                for func in page.get('Functions', []):
-                    func_name = func['FunctionName']
-                    func_arn = func['FunctionArn']
-
-                    # Get tags for the function
-                    try:
-                        tags = self.client.list_tags(Resource=func_arn).get('Tags', {})
-                    except ClientError:
-                        tags = {}
-
-                    resources.append((func_arn, func_name, tags))
+            for functions in self.iter_pages(self.client, 'list_functions', 'Functions'):
+                # Get tags for the functions in this page concurrently
+                for func, tags in zip(functions, self.map_concurrently(self._get_function_tags, functions)):
+                    yield (func['FunctionArn'], func['FunctionName'], tags)
 
         except ClientError as e:
             print(f"Error listing Lambda functions: {e}")
 
-        return resources
+    def _get_function_tags(self, func):
+        """Get the tags for a single Lambda function."""
+        tags = self.lookup_tags(func['FunctionArn'])
+        if tags is not None:
+            return tags
+        try:
+            return self.client.list_tags(Resource=func['FunctionArn']).get('Tags', {})
+        except ClientError:
+            return {}
 
     def apply_tags(self, resource_id, tags):
         """Apply tags to a Lambda function."""
         try:
-            # Get existing tags
-            existing_tags = self.client.list_tags(Resource=resource_id).get('Tags', {})
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tags = self.snapshot_tags(resource_id)
+            if existing_tags is None:
+                existing_tags = self.client.list_tags(Resource=resource_id).get('Tags', {})
             
             # Skip AWS reserved tags (starting with 'aws:')
             tags = {k: v for k, v in tags.items() 
@@ -1,38 +1,48 @@
 from botocore.exceptions import ClientError
+from .arns import opensearch_domain_arn
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class OpenSearchService(BaseAWSService):
     """Handler for Amazon OpenSearch Service domains."""
+
+    client = PooledClient('opensearch')
+
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('opensearch')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'opensearch'
 
-    def get_resources(self):
-        """Get all OpenSearch domains."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all OpenSearch domains."""
         try:
-            # List all OpenSearch domains
-            domains = self.client.list_domain_names()
-            
-            # Get details for each domain
-            for domain in domains.get('DomainNames', []):
-                domain_name = domain['DomainName']
-                try:
-                    domain_info = self.client.describe_domain(DomainName=domain_name)['DomainStatus']
-                    arn = domain_info.get('ARN', f"arn:aws:es:{self.session.region_name}:{self.session.client('sts').get_caller_identity().get('Account')}:domain/{domain_name}")
-                    tags_response = self.client.list_tags(ARN=arn)
-                    tags = {tag['Key']: tag['Value'] for tag in tags_response.get('TagList', [])}
-                    resources.append((arn, domain_name, tags))
-                except ClientError as e:
-                    print(f"Error describing OpenSearch domain {domain_name}: {e}")
+            # List all OpenSearch domains (list_domain_names returns them all in one call)
+            for domains in self.iter_pages(self.client, 'list_domain_names', 'DomainNames'):
+                # Get details for each domain concurrently
+                domain_names = [domain['DomainName'] for domain in domains]
+                for resource in self.map_concurrently(self._get_domain, domain_names):
+                    if resource:
+                        yield resource
                     
         except ClientError as e:
             print(f"Error listing OpenSearch domains: {e}")
-            
-        return resources
+    
+    def _get_domain(self, domain_name):
+        """Get the (arn, name, tags) tuple for a single domain, or None on error."""
+        try:
+            arn = opensearch_domain_arn(self.context, domain_name) if self.synthesize_arns else None
+            if arn is None:
+                domain_info = self.client.describe_domain(DomainName=domain_name)['DomainStatus']
+                arn = domain_info.get('ARN') or self.context.arn('es', f"domain/{domain_name}")
+            tags = self.lookup_tags(arn)
+            if tags is None:
+                tags_response = self.client.list_tags(ARN=arn)
+                tags = {tag['Key']: tag['Value'] for tag in tags_response.get('TagList', [])}
+            return (arn, domain_name, tags)
+        except ClientError as e:
+            print(f"Error describing OpenSearch domain {domain_name}: {e}")
+            return None
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an OpenSearch domain."""
@@ -40,9 +50,11 @@ class OpenSearchService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            existing_tags = self.client.list_tags(ARN=resource_id).get('TagList', [])
-            existing_tags_dict = {tag['Key']: tag['Value'] for tag in existing_tags}
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tags_dict = self.snapshot_tags(resource_id)
+            if existing_tags_dict is None:
+                existing_tags = self.client.list_tags(ARN=resource_id).get('TagList', [])
+                existing_tags_dict = {tag['Key']: tag['Value'] for tag in existing_tags}
             
             # Only add tags that don't exist
             new_tags = {k: v for k, v in tags.items() if k not in existing_tags_dict}
@@ -0,0 +1,65 @@
+import json
+import time
+import zlib
+
+from .changeset import ChangeSet
+
+
+def write_plan(path, records):
+    """
+    Write plan records to a JSONL file, one change per line.
+    records yields (account_id, ChangeSet) pairs; returns the number of changes written.
+    """
+    planned_at = int(time.time())
+    count = 0
+    with open(path, 'w') as f:
+        for account_id, changes in records:
+            for service, resource_id, tag_key, tag_value, region in changes:
+                f.write(json.dumps({
+                    'account': account_id,
+                    'region': region,
+                    'service': service.lower(),
+                    'resource_id': resource_id,
+                    'tag_key': tag_key,
+                    'tag_value': tag_value,
+                    'planned_at': planned_at
+                }, separators=(',', ':')) + '\n')
+                count += 1
+    return count
+
+
+def in_shard(resource_id, shard):
+    """Whether resource_id belongs to shard (index, count); stable across runs and machines."""
+    index, count = shard
+    return zlib.crc32(resource_id.encode()) % count == index
+
+
+def read_plan(path, shard=None, max_age=None):
+    """
+    Read a plan file written by write_plan.
+    Returns ({account_id: ChangeSet}, skipped), where skipped counts the changes
+    left out because they were planned more than max_age seconds ago. With
+    shard=(index, count), only that shard's changes are returned.
+    Raises OSError if the file cannot be read and ValueError if a line is invalid.
+    """
+    plan = {}
+    skipped = 0
+    now = time.time()
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                account_id, resource_id = record['account'], record['resource_id']
+                if shard is not None and not in_shard(resource_id, shard):
+                    continue
+                if max_age is not None and now - record['planned_at'] > max_age:
+                    skipped += 1
+                    continue
+                plan.setdefault(account_id, ChangeSet()).add(
+                    record['service'].upper(), resource_id, record['tag_key'], record['tag_value'], record['region']
+                )
+            except (KeyError, TypeError, json.JSONDecodeError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid plan entry ({e})")
+    return plan, skipped
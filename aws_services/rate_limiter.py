@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+
+# Error codes botocore's standard retry mode treats as throttling
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'TransactionInProgressException',
+    'RequestLimitExceeded',
+    'BandwidthLimitExceeded',
+    'LimitExceededException',
+    'RequestThrottled',
+    'SlowDown',
+    'PriorRequestNotComplete',
+    'EC2ThrottledException',
+}
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate follows AIMD.
+
+    Like botocore's adaptive retry mode, the bucket does not limit anything
+    until the API is first throttled; the rate then starts from the send rate
+    observed so far. Every success adds increase/rate requests per second, so
+    the rate grows by about ``increase`` per second of sustained traffic. A
+    throttle multiplies it by ``decrease`` (at most once per second, since
+    concurrent callers tend to be throttled together).
+    """
+
+    def __init__(self, rate=200.0, min_rate=0.5, max_rate=200.0, increase=1.0, decrease=0.5):
+        # Only enforced once limited is set by the first throttle
+        self.limited = False
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = 1.0
+        self.updated_at = time.monotonic()
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+        # Statistics for the end-of-run report
+        self.calls = 0
+        self.throttles = 0
+        self.lowest_rate = rate
+        self.first_call = None
+        self.last_call = None
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if not self.limited:
+                    self.calls += 1
+                    self.first_call = self.first_call or now
+                    self.last_call = now
+                    return
+                self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self.calls += 1
+                    self.first_call = self.first_call or now
+                    self.last_call = now
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase."""
+        if not self.limited:
+            return
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self):
+        """Multiplicative decrease."""
+        with self.lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self.last_decrease < 1.0:
+                return
+            self.last_decrease = now
+            if not self.limited:
+                self.limited = True
+                self.rate = min(self.rate, self.observed_rate)
+                self.tokens = 0.0
+                self.updated_at = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.lowest_rate = min(self.lowest_rate, self.rate)
+
+    @property
+    def observed_rate(self):
+        """Average requests per second actually sent."""
+        if not self.calls:
+            return 0.0
+        return self.calls / max(1.0, self.last_call - self.first_call)
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-API rate limiter shared by every handler in the process.
+
+    install() hooks into a boto3 session's event system, so every client created
+    from it afterwards (including paginators) waits for a token before each HTTP
+    attempt, and reports throttles back to the limiter. Throttled calls are
+    retried with jittered exponential backoff for up to max_attempts attempts;
+    other errors are left to botocore's own retry handler.
+
+    Buckets are keyed by scope (account and region, whose API limits are
+    independent) and by API, e.g. 'cloudwatch-logs.ListTagsLogGroup'.
+    """
+
+    def __init__(self, max_attempts=10, base_delay=0.5, max_delay=20.0, **bucket_options):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket_options = bucket_options
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, scope, api):
+        """Get (creating it on first use) the bucket for an API in a scope."""
+        key = (scope, api)
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = AdaptiveTokenBucket(**self.bucket_options)
+            return self.buckets[key]
+
+    def install(self, session, context):
+        """Rate-limit the clients created from session from now on; repeat calls are no-ops."""
+        scope = f"{context.account_id}/{context.region}"
+        events = session.events
+
+        def before_send(event_name, **kwargs):
+            self.bucket(scope, event_name.split('.', 1)[1]).acquire()
+
+        def needs_retry(event_name, response=None, attempts=1, **kwargs):
+            return self._on_response(self.bucket(scope, event_name.split('.', 1)[1]), response, attempts)
+
+        events.register('before-send', before_send, unique_id='tag-tool-rate-limit-send')
+        # Registered first so a throttle delay wins over botocore's own retry decision
+        events.register_first('needs-retry', needs_retry, unique_id='tag-tool-rate-limit-retry')
+
+    def _on_response(self, bucket, response, attempts):
+        """Feed one attempt's outcome to the bucket; return a retry delay for throttles."""
+        if response is None:
+            # Connection errors: leave them to botocore
+            return None
+        http_response, parsed = response
+        code = parsed.get('Error', {}).get('Code') if isinstance(parsed, dict) else None
+        if code in THROTTLING_ERROR_CODES or http_response.status_code == 429:
+            bucket.on_throttle()
+            if attempts >= self.max_attempts:
+                return None
+            return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+        if http_response.status_code < 400:
+            bucket.on_success()
+        return None
+
+    def report(self):
+        """
+        Summarize the traffic seen so far.
+        Returns a list of (scope, api, calls, throttles, observed_rate, lowest_rate, rate).
+        """
+        with self.lock:
+            buckets = sorted(self.buckets.items())
+        return [(scope, api, bucket.calls, bucket.throttles, bucket.observed_rate, bucket.lowest_rate, bucket.rate)
+                for (scope, api), bucket in buckets if bucket.calls]
+
+
+# Shared by every handler (and every session) in the process
+RATE_LIMITER = AdaptiveRateLimiter()
@@ -1,49 +1,53 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class RDSService(BaseAWSService):
     """Handler for Amazon RDS resources."""
+
+    client = PooledClient('rds')
+
+    # RDS management APIs share a low per-account rate limit
+    apply_concurrency = 2
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('rds')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'rds'
     
-    def get_resources(self):
-        """Get all RDS instances."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all RDS instances."""
+        seen_arns = set()
         try:
             # Get DB instances
-            paginator = self.client.get_paginator('describe_db_instances')
-            for page in paginator.paginate():
-                for db in page.get('DBInstances', []):
-                    arn = db['DBInstanceArn']
-                    name = db.get('DBInstanceIdentifier', '')
-                    tags = {tag['Key']: tag['Value'] 
-                           for tag in self.client.list_tags_for_resource(
-                               ResourceName=arn).get('TagList', [])}
-                    resources.append((arn, name, tags))
+            for dbs in self.iter_pages(self.client, 'describe_db_instances', 'DBInstances'):
+                arns = [db['DBInstanceArn'] for db in dbs]
+                for db, arn, tags in zip(dbs, arns, self.map_concurrently(self._get_tags, arns)):
+                    seen_arns.add(arn)
+                    yield (arn, db.get('DBInstanceIdentifier', ''), tags)
                     
             # Get DB clusters (for Aurora)
             try:
-                clusters = self.client.describe_db_clusters()
-                for cluster in clusters.get('DBClusters', []):
-                    arn = cluster['DBClusterArn']
-                    name = cluster.get('DBClusterIdentifier', '')
-                    # Only add if not already in resources (to avoid duplicates with instances)
-                    if not any(r[0] == arn for r in resources):
-                        tags = {tag['Key']: tag['Value'] 
-                               for tag in self.client.list_tags_for_resource(
-                                   ResourceName=arn).get('TagList', [])}
-                        resources.append((arn, name, tags))
+                for clusters in self.iter_pages(self.client, 'describe_db_clusters', 'DBClusters'):
+                    # Only add if not already yielded (to avoid duplicates with instances)
+                    clusters = [cluster for cluster in clusters if cluster['DBClusterArn'] not in seen_arns]
+                    arns = [cluster['DBClusterArn'] for cluster in clusters]
+                    for cluster, arn, tags in zip(clusters, arns, self.map_concurrently(self._get_tags, arns)):
+                        yield (arn, cluster.get('DBClusterIdentifier', ''), tags)
             except ClientError as e:
                 print(f"Error getting RDS clusters: {e}")
                 
         except ClientError as e:
             print(f"Error listing RDS resources: {e}")
-            
-        return resources
+    
+    def _get_tags(self, arn):
+        """Get the tags for a single RDS instance or cluster."""
+        tags = self.lookup_tags(arn)
+        if tags is not None:
+            return tags
+        return {tag['Key']: tag['Value'] 
+                for tag in self.client.list_tags_for_resource(
+                    ResourceName=arn).get('TagList', [])}
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an RDS resource."""
@@ -51,13 +55,15 @@ class RDSService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            existing_tags = self.client.list_tags_for_resource(
-                ResourceName=resource_id
-            ).get('TagList', [])
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tag_keys = self.snapshot_tags(resource_id)
+            if existing_tag_keys is None:
+                existing_tags = self.client.list_tags_for_resource(
+                    ResourceName=resource_id
+                ).get('TagList', [])
+                existing_tag_keys = {tag['Key'] for tag in existing_tags}
             
             # Only add tags that don't exist
-            existing_tag_keys = {tag['Key'] for tag in existing_tags}
             new_tags = [{'Key': k, 'Value': v} 
                        for k, v in tags.items() 
                        if k not in existing_tag_keys]
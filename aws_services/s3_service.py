@@ -1,41 +1,87 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class S3Service(BaseAWSService):
     """Handler for AWS S3 buckets."""
+
+    client = PooledClient('s3')
+
+    # list_buckets returns the buckets of every region
+    is_global = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('s3')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 's3'
+        # {bucket_name: region}, loaded from the inventory cache on first use
+        self.bucket_regions = None
+        # Regions resolved during this run and not yet stored in the inventory cache
+        self.new_bucket_regions = {}
     
-    def get_resources(self):
-        """Get all S3 buckets."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all S3 buckets."""
         try:
-            response = self.client.list_buckets()
-            
-            for bucket in response.get('Buckets', []):
-                bucket_name = bucket['Name']
-                
-                try:
-                    # Get bucket tags
-                    tag_response = self.client.get_bucket_tagging(Bucket=bucket_name)
-                    tags = {tag['Key']: tag['Value'] for tag in tag_response.get('TagSet', [])}
-                except ClientError:
-                    # No tags set yet
-                    tags = {}
+            for buckets in self.iter_pages(self.client, 'list_buckets', 'Buckets'):
+                regions = self._get_bucket_regions()
+                for bucket in buckets:
+                    if 'BucketRegion' in bucket and regions.get(bucket['Name']) != bucket['BucketRegion']:
+                        self._set_bucket_region(bucket['Name'], bucket['BucketRegion'])
+                bucket_names = [bucket['Name'] for bucket in buckets]
                 
-                # Use the bucket name as the resource name
-                bucket_name_display = bucket_name
-                
-                resources.append((bucket_name, bucket_name_display, tags))
+                # Get bucket tags concurrently, each from a client in the bucket's region
+                for bucket_name, tags in zip(bucket_names, self.map_concurrently(self._get_bucket_tags, bucket_names)):
+                    # Use the bucket name as the resource name
+                    yield (bucket_name, bucket_name, tags)
+                self._store_bucket_regions()
                 
         except ClientError as e:
             print(f"Error listing S3 buckets: {e}")
-            
-        return resources
+    
+    def _get_bucket_regions(self):
+        """The known {bucket_name: region}, loaded from the inventory cache once."""
+        if self.bucket_regions is None:
+            regions = {}
+            if self.inventory is not None:
+                regions = self.inventory.load_regions(self.context.account_id, self.service_name)
+            self.bucket_regions = regions
+        return self.bucket_regions
+    
+    def _set_bucket_region(self, bucket_name, region):
+        self._get_bucket_regions()[bucket_name] = region
+        self.new_bucket_regions[bucket_name] = region
+    
+    def _store_bucket_regions(self):
+        """Persist the regions resolved since the last call."""
+        if self.inventory is not None and self.new_bucket_regions:
+            regions, self.new_bucket_regions = self.new_bucket_regions, {}
+            self.inventory.store_regions(self.context.account_id, self.service_name, regions)
+    
+    def _bucket_client(self, bucket_name):
+        """
+        The pooled S3 client for the bucket's region, so calls avoid the
+        redirect round trip a client in another region takes. Regions missing
+        from list_buckets and the cache are read once with get_bucket_location.
+        """
+        region = self._get_bucket_regions().get(bucket_name)
+        if region is None:
+            try:
+                location = self.client.get_bucket_location(Bucket=bucket_name).get('LocationConstraint')
+            except ClientError:
+                # Let the home-region client (and its redirects) deal with it
+                return self.client
+            # Buckets in us-east-1 have no location constraint; 'EU' is the legacy name of eu-west-1
+            region = {None: 'us-east-1', '': 'us-east-1', 'EU': 'eu-west-1'}.get(location, location)
+            self._set_bucket_region(bucket_name, region)
+        return self.client_pool.client(self.session, 's3', region)
+    
+    def _get_bucket_tags(self, bucket_name):
+        """Get the tags for a single S3 bucket."""
+        try:
+            tag_response = self._bucket_client(bucket_name).get_bucket_tagging(Bucket=bucket_name)
+            return {tag['Key']: tag['Value'] for tag in tag_response.get('TagSet', [])}
+        except ClientError:
+            # No tags set yet
+            return {}
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an S3 bucket."""
@@ -43,9 +89,11 @@ class S3Service(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
+            # Get existing tags. Always re-read: put_bucket_tagging replaces the
+            # whole tag set, so a stale scan snapshot could drop newer tags
+            client = self._bucket_client(resource_id)
             try:
-                existing_tags = self.client.get_bucket_tagging(Bucket=resource_id)
+                existing_tags = client.get_bucket_tagging(Bucket=resource_id)
                 existing_tag_dict = {tag['Key']: tag['Value'] for tag in existing_tags.get('TagSet', [])}
             except ClientError as e:
                 if e.response['Error']['Code'] != 'NoSuchTagSet':
@@ -64,7 +112,7 @@ class S3Service(BaseAWSService):
             # Convert to tag set format
             tag_set = [{'Key': k, 'Value': v} for k, v in all_tags.items()]
             
-            self.client.put_bucket_tagging(
+            client.put_bucket_tagging(
                 Bucket=resource_id,
                 Tagging={'TagSet': tag_set}
             )
@@ -73,3 +121,9 @@ class S3Service(BaseAWSService):
         except ClientError as e:
             print(f"Error tagging S3 bucket {resource_id}: {e}")
             return False
+    
+    def apply_tags_batch(self, items):
+        """Apply tags one bucket at a time, then keep the bucket regions resolved on the way."""
+        results = super().apply_tags_batch(items)
+        self._store_bucket_regions()
+        return results
@@ -1,40 +1,44 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class SNSService(BaseAWSService):
     """Handler for Amazon SNS resources."""
+
+    client = PooledClient('sns')
+
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('sns')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'sns'
     
-    def get_resources(self):
-        """Get all SNS topics."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all SNS topics."""
         try:
             # Get all topics
-            paginator = self.client.get_paginator('list_topics')
-            for page in paginator.paginate():
-                for topic in page.get('Topics', []):
-                    topic_arn = topic['TopicArn']
+            for topics in self.iter_pages(self.client, 'list_topics', 'Topics'):
+                topic_arns = [topic['TopicArn'] for topic in topics]
+                
+                # Get topic tags concurrently
+                for topic_arn, tags in zip(topic_arns, self.map_concurrently(self._get_topic_tags, topic_arns)):
                     topic_name = topic_arn.split(':')[-1]
-                    
-                    # Get topic tags
-                    try:
-                        tags_response = self.client.list_tags_for_resource(ResourceArn=topic_arn)
-                        tags = {tag['Key']: tag['Value'] for tag in tags_response.get('Tags', [])}
-                    except ClientError as e:
-                        print(f"Error getting tags for SNS topic {topic_arn}: {e}")
-                        tags = {}
-                    
-                    resources.append((topic_arn, topic_name, tags))
+                    yield (topic_arn, topic_name, tags)
                     
         except ClientError as e:
             print(f"Error listing SNS topics: {e}")
-            
-        return resources
+    
+    def _get_topic_tags(self, topic_arn):
+        """Get the tags for a single SNS topic."""
+        tags = self.lookup_tags(topic_arn)
+        if tags is not None:
+            return tags
+        try:
+            tags_response = self.client.list_tags_for_resource(ResourceArn=topic_arn)
+            return {tag['Key']: tag['Value'] for tag in tags_response.get('Tags', [])}
+        except ClientError as e:
+            print(f"Error getting tags for SNS topic {topic_arn}: {e}")
+            return {}
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an SNS topic."""
@@ -42,14 +46,16 @@ class SNSService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            try:
-                existing_tags = self.client.list_tags_for_resource(ResourceArn=resource_id).get('Tags', [])
-                existing_tag_keys = {tag['Key'] for tag in existing_tags}
-            except ClientError as e:
-                if e.response['Error']['Code'] != 'ResourceNotFound':
-                    raise
-                existing_tag_keys = set()
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tag_keys = self.snapshot_tags(resource_id)
+            if existing_tag_keys is None:
+                try:
+                    existing_tags = self.client.list_tags_for_resource(ResourceArn=resource_id).get('Tags', [])
+                    existing_tag_keys = {tag['Key'] for tag in existing_tags}
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'ResourceNotFound':
+                        raise
+                    existing_tag_keys = set()
             
             # Only add tags that don't exist
             new_tags = [{'Key': k, 'Value': v} 
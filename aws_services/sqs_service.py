@@ -1,47 +1,56 @@
 from botocore.exceptions import ClientError
+from .arns import sqs_queue_arn
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
 
 class SQSService(BaseAWSService):
     """Handler for Amazon SQS resources."""
+
+    client = PooledClient('sqs')
+
+    # tag_queue has generous per-queue limits
+    apply_concurrency = 8
+    arn_resource_ids = True
     
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('sqs')
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
         self.service_name = 'sqs'
     
-    def get_resources(self):
-        """Get all SQS queues."""
-        resources = []
-        
+    def iter_resources(self):
+        """Yield all SQS queues."""
         try:
-            # Get queue URLs
-            response = self.client.list_queues()
-            queue_urls = response.get('QueueUrls', [])
-            
-            for queue_url in queue_urls:
-                try:
-                    # Get queue attributes including tags
-                    queue_attrs = self.client.get_queue_attributes(
-                        QueueUrl=queue_url,
-                        AttributeNames=['QueueArn', 'All']
-                    )['Attributes']
-                    
-                    arn = queue_attrs.get('QueueArn', '')
-                    queue_name = queue_url.split('/')[-1]
-                    
-                    # Get queue tags
-                    tags_response = self.client.list_queue_tags(QueueUrl=queue_url)
-                    tags = tags_response.get('Tags', {})
-                    
-                    resources.append((arn, queue_name, tags))
-                    
-                except ClientError as e:
-                    print(f"Error getting info for SQS queue {queue_url}: {e}")
+            # Get queue URLs, up to 1000 per page
+            for queue_urls in self.iter_pages(self.client, 'list_queues', 'QueueUrls',
+                                              PaginationConfig={'PageSize': 1000}):
+                for resource in self.map_concurrently(self._get_queue, queue_urls):
+                    if resource:
+                        yield resource
                     
         except ClientError as e:
             print(f"Error listing SQS queues: {e}")
+    
+    def _get_queue(self, queue_url):
+        """Get the (arn, name, tags) tuple for a single queue, or None on error."""
+        try:
+            arn = sqs_queue_arn(self.context, queue_url) if self.synthesize_arns else None
+            if arn is None:
+                arn = self.client.get_queue_attributes(
+                    QueueUrl=queue_url,
+                    AttributeNames=['QueueArn']
+                )['Attributes'].get('QueueArn', '')
+            queue_name = queue_url.split('/')[-1]
+            
+            # Get queue tags
+            tags = self.lookup_tags(arn)
+            if tags is None:
+                tags_response = self.client.list_queue_tags(QueueUrl=queue_url)
+                tags = tags_response.get('Tags', {})
             
-        return resources
+            return (arn, queue_name, tags)
+            
+        except ClientError as e:
+            print(f"Error getting info for SQS queue {queue_url}: {e}")
+            return None
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to an SQS queue."""
@@ -56,13 +65,15 @@ class SQSService(BaseAWSService):
             region = resource_id.split(':')[3]
             queue_url = f"https://sqs.{region}.amazonaws.com/{account_id}/{queue_name}"
             
-            # Get existing tags
-            try:
-                existing_tags = self.client.list_queue_tags(QueueUrl=queue_url).get('Tags', {})
-            except ClientError as e:
-                if e.response['Error']['Code'] != 'AWS.SimpleQueueService.NonExistentQueue':
-                    raise
-                existing_tags = {}
+            # Get existing tags, reusing the ones seen during the scan
+            existing_tags = self.snapshot_tags(resource_id)
+            if existing_tags is None:
+                try:
+                    existing_tags = self.client.list_queue_tags(QueueUrl=queue_url).get('Tags', {})
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'AWS.SimpleQueueService.NonExistentQueue':
+                        raise
+                    existing_tags = {}
             
             # Only add tags that don't exist
             new_tags = {k: v for k, v in tags.items() if k not in existing_tags}
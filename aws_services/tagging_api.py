@@ -0,0 +1,132 @@
+from .client_pool import CLIENT_POOL
+from .instrumentation import ACCESS_DENIED, API_STATS
+from .rate_limiter import RATE_LIMITER
+
+# Resource types requested from the Resource Groups Tagging API for each handler.
+# EC2 and VPC are not listed because their describe calls already return tags, and
+# S3 is left out because the API only reports buckets located in the caller's region.
+RESOURCE_TYPE_FILTERS = {
+    'lambda': ['lambda:function'],
+    'eks': ['eks:cluster'],
+    'elb': ['elasticloadbalancing:loadbalancer', 'elasticloadbalancing:targetgroup'],
+    'opensearch': ['es:domain'],
+    'rds': ['rds:db', 'rds:cluster'],
+    'dynamodb': ['dynamodb:table'],
+    'sqs': ['sqs'],
+    'sns': ['sns'],
+    'apigateway': ['apigateway:restapis'],
+    'cloudwatch': ['cloudwatch:alarm', 'logs:log-group'],
+}
+
+def parse_arn(arn):
+    """
+    Map an ARN to the (service_name, resource_id, resource_name) tuple the
+    matching handler would produce for an untagged resource, or None if no
+    handler covers it.
+    """
+    parts = arn.split(':', 5)
+    if len(parts) < 6:
+        return None
+    service, resource = parts[2], parts[5]
+
+    if service == 'lambda' and resource.startswith('function:'):
+        # Skip qualified ARNs (versions and aliases); handlers work on functions
+        if resource.count(':') != 1:
+            return None
+        return ('lambda', arn, resource.split(':', 1)[1])
+
+    if service == 'ec2' and resource.startswith('instance/'):
+        instance_id = resource.split('/', 1)[1]
+        return ('ec2', instance_id, f"ec2-{instance_id}")
+
+    if service == 'ec2' and resource.startswith('vpc/'):
+        vpc_id = resource.split('/', 1)[1]
+        return ('vpc', vpc_id, f"vpc-{vpc_id}")
+
+    if service == 's3' and '/' not in resource:
+        return ('s3', resource, resource)
+
+    if service == 'eks' and resource.startswith('cluster/'):
+        return ('eks', arn, resource.split('/', 1)[1])
+
+    if service == 'elasticloadbalancing' and resource.startswith('loadbalancer/'):
+        path = resource.split('/')
+        if len(path) == 2:
+            # Classic Load Balancer: loadbalancer/{name}
+            return ('elb', f"classic/{path[1]}", path[1])
+        # Application/Network Load Balancer: loadbalancer/{app|net}/{name}/{id}
+        return ('elb', arn, path[2])
+
+    if service == 'elasticloadbalancing' and resource.startswith('targetgroup/'):
+        # Target group: targetgroup/{name}/{id}
+        return ('elb', arn, resource.split('/')[1])
+
+    if service == 'es' and resource.startswith('domain/'):
+        return ('opensearch', arn, resource.split('/', 1)[1])
+
+    if service == 'rds' and resource.split(':', 1)[0] in ('db', 'cluster'):
+        return ('rds', arn, resource.split(':', 1)[1])
+
+    if service == 'dynamodb' and resource.startswith('table/') and resource.count('/') == 1:
+        return ('dynamodb', arn, resource.split('/', 1)[1])
+
+    if service == 'sqs' and ':' not in resource:
+        return ('sqs', arn, resource)
+
+    if service == 'sns' and ':' not in resource:
+        return ('sns', arn, resource)
+
+    if service == 'apigateway' and resource.startswith('/restapis/') and resource.count('/') == 2:
+        api_id = resource.split('/')[2]
+        # The API name is not part of the ARN, so the ID stands in for it
+        return ('apigateway', api_id, f"api-{api_id}")
+
+    if service == 'cloudwatch' and resource.startswith('alarm:'):
+        return ('cloudwatch', arn, resource.split(':', 1)[1])
+
+    if service == 'logs' and resource.startswith('log-group:'):
+        if arn.endswith(':*'):
+            arn = arn[:-2]
+        return ('cloudwatch', arn, arn.split(':log-group:', 1)[1])
+
+    return None
+
+class TaggingAPIScanner:
+    """
+    Bulk tag scanner backed by the Resource Groups Tagging API.
+
+    One paginated get_resources sweep returns the tags of every supported
+    resource, so handlers only need their list calls to enumerate resources.
+    The API never reports resources that have never been tagged; handlers
+    treat anything missing from the index as untagged.
+    """
+
+    def __init__(self, session, context=None):
+        self.session = session
+        if context is not None:
+            # Share the handlers' rate limiter (see rate_limiter)
+            RATE_LIMITER.install(session, context)
+        API_STATS.install(session)
+        ACCESS_DENIED.install(session)
+        self.client = CLIENT_POOL.client(session, 'resourcegroupstaggingapi')
+
+    def scan(self, service_names):
+        """
+        Fetch tags for the supported services among service_names.
+        Returns a dict of {service_name: {resource_id: tags_dict}}.
+        """
+        index = {name: {} for name in service_names if name in RESOURCE_TYPE_FILTERS}
+        if not index:
+            return index
+
+        type_filters = [type_filter for name in index for type_filter in RESOURCE_TYPE_FILTERS[name]]
+        paginator = self.client.get_paginator('get_resources')
+        for page in paginator.paginate(ResourceTypeFilters=type_filters, ResourcesPerPage=100):
+            for mapping in page.get('ResourceTagMappingList', []):
+                parsed = parse_arn(mapping['ResourceARN'])
+                if not parsed or parsed[0] not in index:
+                    continue
+                service_name, resource_id, _ = parsed
+                index[service_name][resource_id] = {tag['Key']: tag['Value'] for tag in mapping.get('Tags', [])}
+
+        return index
@@ -1,33 +1,42 @@
 from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
+from .client_pool import PooledClient
+from .ec2_service import EC2NameIndex, create_tags, create_tags_batch, existing_tag_keys
 
 class VPCService(BaseAWSService):
     """Handler for AWS VPC resources."""
 
-    def __init__(self, session):
-        super().__init__(session)
-        self.client = session.client('ec2')
-        self.service_name = 'vpc'
+    client = PooledClient('ec2')
+
+    # describe_tags accepts up to 200 values per filter
+    batch_size = 200
+
+    # describe_vpcs returns at most 1000 VPCs per page
+    page_size = 1000
 
-    def get_resources(self):
-        """Get all VPCs."""
-        resources = []
+    # Seconds a Name index swept by another EC2-family scan is reused for
+    # this one (see EC2NameIndex)
+    name_index_ttl = 60
+
+    def __init__(self, session, context=None):
+        super().__init__(session, context)
+        self.service_name = 'vpc'
 
+    def iter_resources(self):
+        """Yield all VPCs."""
         try:
-            response = self.client.describe_vpcs()
-            
-            for vpc in response.get('Vpcs', []):
-                vpc_id = vpc['VpcId']
-                tags = {tag['Key']: tag['Value'] for tag in vpc.get('Tags', [])}
-                
-                # Use the Name tag if it exists, otherwise generate a name
-                vpc_name = tags.get('Name', f"vpc-{vpc_id}")
-                resources.append((vpc_id, vpc_name, tags))
+            # Name tags come from the region's shared index; the listing only provides IDs
+            names = EC2NameIndex.for_handler(self).get(self.client, self.name_index_ttl)
+            for vpcs in self.iter_pages(self.client, 'describe_vpcs', 'Vpcs', PaginationConfig={'PageSize': self.page_size}):
+                for vpc_id in (vpc['VpcId'] for vpc in vpcs):
+                    tags = {'Name': names[vpc_id]} if vpc_id in names else {}
+                    
+                    # Use the Name tag if it exists, otherwise generate a name
+                    vpc_name = tags.get('Name', f"vpc-{vpc_id}")
+                    yield (vpc_id, vpc_name, tags)
 
         except ClientError as e:
             print(f"Error listing VPCs: {e}")
-
-        return resources
     
     def apply_tags(self, resource_id, tags):
         """Apply tags to a VPC."""
@@ -35,30 +44,23 @@ class VPCService(BaseAWSService):
             # Skip AWS reserved tags
             tags = {k: v for k, v in tags.items() if not k.startswith('aws:')}
             
-            # Get existing tags
-            response = self.client.describe_tags(
-                Filters=[
-                    {'Name': 'resource-id', 'Values': [resource_id]},
-                    {'Name': 'key', 'Values': list(tags.keys())}
-                ]
-            )
+            # Get existing tags, reusing the ones seen during the scan
+            existing = existing_tag_keys(self, [resource_id], set(tags))
             
             # Get tags that don't exist yet
-            existing_tag_keys = {tag['Key'] for tag in response.get('Tags', [])}
-            new_tags = [{'Key': k, 'Value': v} 
-                      for k, v in tags.items() 
-                      if k not in existing_tag_keys]
+            new_tags = {k: v for k, v in tags.items() if (resource_id, k) not in existing}
             
             if not new_tags:
                 return True
                 
             # Only add new tags that don't exist
-            self.client.create_tags(
-                Resources=[resource_id],
-                Tags=new_tags
-            )
+            create_tags(self, [resource_id], new_tags)
             return True
             
         except ClientError as e:
             print(f"Error tagging VPC {resource_id}: {e}")
             return False
+    
+    def apply_tags_batch(self, items):
+        """Apply tags to many VPCs."""
+        return create_tags_batch(self, items)
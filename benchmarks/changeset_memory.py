@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Memory used per pending change: flat tuple list versus ChangeSet.
+
+The resource IDs and names are created up front and shared by both
+representations, so the numbers only count what storing a change costs.
+"Before" is the list of (SERVICE, resource_id, 'Name', name, region) tuples
+the tool used to keep, plus the per-type regrouping that preview and apply
+each built from it. Each regrouping was a temporary of its own call, so only
+one of them was ever alive next to the list: the figure is the peak of the
+list with the larger regrouping, not the sum of both.
+
+Usage: python benchmarks/changeset_memory.py [RESOURCES ...]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aws_services.changeset import ChangeSet
+
+SERVICES = ['cloudwatch', 'lambda', 'sqs', 'sns', 'dynamodb']
+REGIONS = ['us-east-1', 'eu-west-1']
+
+
+def make_resources(count):
+    """Build (service, resource_id, name, region) inputs outside the measured section."""
+    resources = []
+    for i in range(count):
+        service = SERVICES[i % len(SERVICES)]
+        region = REGIONS[i % len(REGIONS)]
+        name = f"resource-{i:08d}"
+        resources.append((service, f"arn:aws:{service}:{region}:123456789012:{name}", name, region))
+    return resources
+
+
+def group_for_apply(changes):
+    """The regrouping apply_changes used to build (and drop on return)."""
+    groups = {}
+    for resource_type, resource_id, tag_key, tag_value, region in changes:
+        groups.setdefault((resource_type.lower(), region), []).append((resource_id, tag_key, tag_value))
+    return groups
+
+
+def group_for_preview(changes):
+    """The regrouping _print_resources used to build (and drop on return)."""
+    groups = {}
+    for resource_type, resource_id, tag_key, tag_value, region in changes:
+        groups.setdefault(f"{resource_type} [{region}]", []).append((resource_id, tag_key, tag_value))
+    return groups
+
+
+def build_tuples(resources):
+    """The previous representation: one fresh tuple (and service string) per change, regrouped once per call."""
+    changes = [(service.upper(), resource_id, 'Name', name, region) for service, resource_id, name, region in resources]
+    # Preview, then apply, each with its own temporary regrouping
+    group_for_preview(changes)
+    group_for_apply(changes)
+    return changes
+
+
+def build_changeset(resources):
+    """The ChangeSet representation, which preview and apply iterate as is."""
+    changes = ChangeSet()
+    for service, resource_id, name, region in resources:
+        changes.add(service.upper(), resource_id, 'Name', name, region)
+    return changes
+
+
+def measure(builder, resources):
+    """Peak bytes allocated while builder(resources) runs."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = builder(resources)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main(argv):
+    counts = [int(arg) for arg in argv] or [10_000, 100_000, 1_000_000]
+    print(f"{'resources':>10} {'tuples peak B/res':>18} {'ChangeSet peak B/res':>21}")
+    for count in counts:
+        resources = make_resources(count)
+        tuples = measure(build_tuples, resources) / count
+        changeset = measure(build_changeset, resources) / count
+        print(f"{count:>10} {tuples:>18.1f} {changeset:>21.1f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
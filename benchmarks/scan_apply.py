@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+End-to-end scan and apply benchmark against synthetic (moto) accounts.
+
+For every service and size, a fresh mocked account is filled with that many
+resources, then AWSTaggingTool.process_resources and apply_changes run against
+it. Wall time, API calls (per operation and per resource) and peak traced
+memory are recorded for each phase and written as JSON, so runs can be
+compared across versions and concurrency settings.
+
+--latency adds a fixed delay to every HTTP attempt, which makes concurrency
+settings behave as they would against real endpoints. Peak memory comes from
+tracemalloc, which slows every run down (by the same factor for every version);
+pass --no-memory for timings without it. Moto serves the API in-process, so the
+peak includes its allocations too: compare runs with each other, not with
+production.
+
+Requires moto: pip install "moto[all]"
+
+Usage: python benchmarks/scan_apply.py --services lambda sqs --sizes 1000 10000 --out results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+from collections import Counter
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boto3
+from moto import mock_aws
+
+from aws_services import CLIENT_POOL, SERVICE_REGISTRY
+from aws_services.ec2_service import EC2NameIndex
+from tagging_tool import AWSTaggingTool
+
+REGION = 'us-east-1'
+
+
+def _lambda_zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('handler.py', 'def handler(event, context):\n    return event\n')
+    return buffer.getvalue()
+
+
+def create_lambda(count):
+    role = boto3.client('iam').create_role(
+        RoleName='bench-lambda-role',
+        AssumeRolePolicyDocument=json.dumps({'Version': '2012-10-17', 'Statement': []})
+    )['Role']['Arn']
+    client = boto3.client('lambda', region_name=REGION)
+    code = _lambda_zip()
+    for i in range(count):
+        client.create_function(FunctionName=f'bench-function-{i:06d}', Runtime='python3.12', Role=role,
+                               Handler='handler.handler', Code={'ZipFile': code})
+
+
+def create_s3(count):
+    client = boto3.client('s3', region_name=REGION)
+    for i in range(count):
+        client.create_bucket(Bucket=f'bench-bucket-{i:06d}')
+
+
+def create_cloudwatch(count):
+    client = boto3.client('logs', region_name=REGION)
+    for i in range(count):
+        client.create_log_group(logGroupName=f'/bench/log-group-{i:06d}')
+
+
+def create_sqs(count):
+    client = boto3.client('sqs', region_name=REGION)
+    for i in range(count):
+        client.create_queue(QueueName=f'bench-queue-{i:06d}')
+
+
+def create_sns(count):
+    client = boto3.client('sns', region_name=REGION)
+    for i in range(count):
+        client.create_topic(Name=f'bench-topic-{i:06d}')
+
+
+def create_dynamodb(count):
+    client = boto3.client('dynamodb', region_name=REGION)
+    for i in range(count):
+        client.create_table(TableName=f'bench-table-{i:06d}', BillingMode='PAY_PER_REQUEST',
+                            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}])
+
+
+def create_elb(count):
+    client = boto3.client('elb', region_name=REGION)
+    for i in range(count):
+        client.create_load_balancer(LoadBalancerName=f'bench-lb-{i:06d}', AvailabilityZones=[f'{REGION}a'],
+                                    Listeners=[{'Protocol': 'HTTP', 'LoadBalancerPort': 80, 'InstancePort': 80}])
+
+
+def create_ec2(count):
+    client = boto3.client('ec2', region_name=REGION)
+    image_id = client.describe_images(Owners=['amazon'])['Images'][0]['ImageId']
+    for start in range(0, count, 1000):
+        batch = min(1000, count - start)
+        client.run_instances(ImageId=image_id, InstanceType='t3.micro', MinCount=batch, MaxCount=batch)
+
+
+def create_vpc(count):
+    client = boto3.client('ec2', region_name=REGION)
+    for _ in range(count):
+        client.create_vpc(CidrBlock='10.0.0.0/16')
+
+
+def create_apigateway(count):
+    client = boto3.client('apigateway', region_name=REGION)
+    for i in range(count):
+        client.create_rest_api(name=f'bench-api-{i:06d}')
+
+
+# Services the benchmark can synthesize, with the function that creates their resources
+SYNTHESIZERS = {
+    'lambda': create_lambda,
+    's3': create_s3,
+    'cloudwatch': create_cloudwatch,
+    'sqs': create_sqs,
+    'sns': create_sns,
+    'dynamodb': create_dynamodb,
+    'elb': create_elb,
+    'ec2': create_ec2,
+    'vpc': create_vpc,
+    'apigateway': create_apigateway,
+}
+
+
+class InstrumentedSessions:
+    """Session factory that counts every HTTP attempt by API and optionally adds latency to it."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def session(self, region=None):
+        session = boto3.Session(region_name=region)
+        session.events.register('before-send', self._before_send)
+        return session
+
+    def _before_send(self, event_name, **kwargs):
+        with self.lock:
+            self.calls[event_name.split('.', 1)[1]] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def take_calls(self):
+        """Return the calls counted since the last take_calls and reset the counter."""
+        with self.lock:
+            calls, self.calls = self.calls, Counter()
+        return calls
+
+
+def run_phase(func, sessions, resources, measure_memory):
+    """Run one phase and return its measurements."""
+    sessions.take_calls()
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    # Handlers print one line per resource; keep that out of the results
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        func()
+    wall = time.perf_counter() - started
+    peak = None
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    calls = sessions.take_calls()
+    total = sum(calls.values())
+    return {
+        'wall_seconds': round(wall, 4),
+        'api_calls': total,
+        'calls_per_resource': round(total / resources, 3) if resources else None,
+        'calls_by_api': dict(sorted(calls.items())),
+        'peak_memory_bytes': peak,
+    }
+
+
+def run_benchmark(service, size, args, config_path):
+    """Synthesize one account and benchmark the scan and apply of one service."""
+    with mock_aws():
+        SYNTHESIZERS[service](size)
+        # Pooled clients carry the hooks of the previous run's sessions, and
+        # shared indexes describe the previous run's account
+        CLIENT_POOL.clear()
+        EC2NameIndex.indexes.clear()
+        sessions = InstrumentedSessions(args.latency / 1000.0)
+        tool = AWSTaggingTool(config_path, max_workers=args.workers, session_factory=sessions.session)
+        tool._get_context()
+
+        scan = run_phase(tool.process_resources, sessions, size, not args.no_memory)
+        changes = len(tool.changes)
+        apply = run_phase(lambda: tool.apply_changes(args.apply_workers), sessions, changes, not args.no_memory)
+
+    return {
+        'service': service,
+        'resources': size,
+        'changes': changes,
+        'scan': scan,
+        'apply': apply,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark scan and apply against synthetic moto accounts.')
+    parser.add_argument('--services', nargs='+', choices=sorted(SYNTHESIZERS), default=['lambda', 's3', 'cloudwatch', 'sqs'],
+                        help='Services to benchmark (default: lambda s3 cloudwatch sqs)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                        help='Number of resources per synthetic account (default: 1000 10000 100000)')
+    parser.add_argument('--workers', type=int, help='AWSTaggingTool max_workers for the scan')
+    parser.add_argument('--apply-workers', type=int, default=1, help='max_workers for apply_changes (default: 1)')
+    parser.add_argument('--concurrency', type=int,
+                        help="Override every handler's max_concurrency for per-resource calls")
+    parser.add_argument('--latency', type=float, default=0.0, metavar='MS',
+                        help='Latency added to every API call, in milliseconds (default: 0)')
+    parser.add_argument('--no-memory', action='store_true', help='Do not trace memory (faster, no peak memory)')
+    parser.add_argument('--out', help='Write the JSON results to this file instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.concurrency:
+        for service in args.services:
+            SERVICE_REGISTRY[service].max_concurrency = args.concurrency
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for service in args.services:
+            config_path = os.path.join(directory, f'{service}.json')
+            with open(config_path, 'w') as f:
+                json.dump({service: True}, f)
+            for size in args.sizes:
+                print(f"{service}: {size} resources...", file=sys.stderr)
+                results.append(run_benchmark(service, size, args, config_path))
+
+    report = {
+        'benchmark': 'scan_apply',
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'settings': {
+            'workers': args.workers,
+            'apply_workers': args.apply_workers,
+            'concurrency': args.concurrency,
+            'latency_ms': args.latency,
+            'memory_traced': not args.no_memory,
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark: package import, handler construction and client creation.
+
+Every measurement runs in a fresh interpreter, so imports are cold:
+
+- import: `import aws_services`
+- first_handler: the import plus building one handler and its client
+- handlers: building every handler in --sessions sessions (as a multi-worker or
+  multi-region run does) and creating all their clients, once with the shared
+  client pool and once with a private pool per handler (no sharing)
+
+No AWS call is made; fake credentials are set so clients can be built offline.
+Each measurement is repeated --repeat times and the median is reported.
+
+Usage: python benchmarks/startup.py --sessions 4 --repeat 5 --out startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CHILD_CODE = {
+    'import': """
+import time
+started = time.perf_counter()
+import aws_services
+print(time.perf_counter() - started)
+""",
+    'first_handler': """
+import time
+started = time.perf_counter()
+import boto3
+from aws_services import RunContext, get_service_handler
+session = boto3.Session(region_name='us-east-1')
+handler = get_service_handler('lambda', session, RunContext('123456789012', 'us-east-1'))
+handler.client
+print(time.perf_counter() - started)
+""",
+    'handlers': """
+import sys, time
+import boto3
+from aws_services import SERVICE_REGISTRY, ClientPool, RunContext
+from aws_services.client_pool import PooledClient
+# Imported before the clock starts: only construction and clients are timed
+handler_classes = list(SERVICE_REGISTRY.values())
+sessions = [boto3.Session(region_name='us-east-1') for _ in range(int(sys.argv[1]))]
+shared = sys.argv[2] == 'shared'
+context = RunContext('123456789012', 'us-east-1')
+started = time.perf_counter()
+for session in sessions:
+    for service_class in handler_classes:
+        handler = service_class(session, context)
+        if not shared:
+            handler.client_pool = ClientPool()
+        for klass in type(handler).__mro__:
+            for name, attribute in vars(klass).items():
+                if isinstance(attribute, PooledClient):
+                    getattr(handler, name)
+print(time.perf_counter() - started)
+""",
+}
+
+
+def run_child(name, *argv):
+    """Run one measurement in a fresh interpreter and return its seconds."""
+    env = dict(os.environ, AWS_ACCESS_KEY_ID='testing', AWS_SECRET_ACCESS_KEY='testing',
+               AWS_DEFAULT_REGION='us-east-1', PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, '-c', CHILD_CODE[name], *argv], capture_output=True, text=True,
+                            env=env, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def median_seconds(repeat, name, *argv):
+    return round(statistics.median(run_child(name, *argv) for _ in range(repeat)), 4)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark import and handler/client startup time.')
+    parser.add_argument('--sessions', type=int, default=4,
+                        help='Sessions to build every handler in, e.g. workers or regions (default: 4)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the median is kept (default: 5)')
+    parser.add_argument('--out', help='Write the JSON results to this file instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sessions = str(args.sessions)
+    report = {
+        'benchmark': 'startup',
+        'python': platform.python_version(),
+        'settings': {'sessions': args.sessions, 'repeat': args.repeat},
+        'results': {
+            'import_seconds': median_seconds(args.repeat, 'import'),
+            'first_handler_seconds': median_seconds(args.repeat, 'first_handler'),
+            'handlers_shared_pool_seconds': median_seconds(args.repeat, 'handlers', sessions, 'shared'),
+            'handlers_unshared_seconds': median_seconds(args.repeat, 'handlers', sessions, 'unshared'),
+        },
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,140 @@
 #!/usr/bin/env python3
+import argparse
 import boto3
+import contextvars
 import json
+import os
+import queue
 import sys
-import importlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
 from botocore.exceptions import ClientError
 from colorama import init, Fore, Style
-from typing import List, Tuple, Dict, Any, Optional
+from typing import Callable, List, Tuple, Dict, Any, Optional
+
+from aws_services import (CLIENT_POOL, SERVICE_REGISTRY, AssumedRoleSessions, RunContext, get_service_handler,
+                          list_organization_accounts)
+from aws_services.changeset import ChangeSet
+from aws_services.events import FileEventSource, SQSEventSource, created_resources, queue_region
+from aws_services.instrumentation import ACCESS_DENIED, API_STATS
+from aws_services.inventory import InventoryCache, default_cache_dir
+from aws_services.journal import ApplyJournal
+from aws_services.plan import read_plan, write_plan
+from aws_services.rate_limiter import RATE_LIMITER
+from aws_services.tagging_api import TaggingAPIScanner
 
 # Initialize colorama
 init()
 
+def list_enabled_regions(session: boto3.Session) -> List[str]:
+    """List every region enabled for the session's account."""
+    try:
+        response = session.client('ec2').describe_regions(AllRegions=False)
+        return sorted(region['RegionName'] for region in response.get('Regions', []))
+    except ClientError as e:
+        print(f"{Fore.RED}Error listing enabled regions: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+def print_rate_report() -> None:
+    """Print the request rate observed for every API called during the run."""
+    report = RATE_LIMITER.report()
+    if not report:
+        return
+    print(f"\n{Fore.CYAN}API call rates:{Style.RESET_ALL}")
+    for scope, api, calls, throttles, observed_rate, lowest_rate, rate in report:
+        line = f"  {scope} {api}: {calls} calls, {observed_rate:.1f}/s"
+        if throttles:
+            color = Fore.YELLOW
+            line += f", {throttles} throttled (limit went down to {lowest_rate:.1f}/s, ended at {rate:.1f}/s)"
+        else:
+            color = ''
+        print(f"{color}{line}{Style.RESET_ALL}")
+
+def print_api_stats(json_path: Optional[str] = None) -> None:
+    """Print the per-API call statistics collected during the run, optionally writing them as JSON."""
+    report = API_STATS.report()
+    if json_path:
+        try:
+            with open(json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            print(f"{Fore.RED}Error writing API statistics: {e}{Style.RESET_ALL}")
+    if not report:
+        return
+    print(f"\n{Fore.CYAN}API calls by phase and handler:{Style.RESET_ALL}")
+    print(f"  {'phase':<6} {'handler':<12} {'api':<40} {'calls':>6} {'retries':>7} {'throttles':>9} "
+          f"{'errors':>6} {'avg ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'max ms':>8}")
+    for row in report:
+        color = Fore.YELLOW if row['throttles'] or row['errors'] else ''
+        print(f"{color}  {row['phase']:<6} {row['handler']:<12} {row['api']:<40} {row['calls']:>6} "
+              f"{row['retries']:>7} {row['throttles']:>9} {row['errors']:>6} {row['avg_ms']:>8.1f} "
+              f"{row['p50_ms']:>7.1f} {row['p95_ms']:>7.1f} {row['max_ms']:>8.1f}{Style.RESET_ALL}")
+
+def print_run_report(args: argparse.Namespace) -> None:
+    """Print the end-of-run reports."""
+    print_rate_report()
+    if API_STATS.enabled:
+        print_api_stats(args.stats_json)
+
 class AWSTaggingTool:
-    def __init__(self, config_file: str = 'tagging_resources_conf.json'):
-        self.session = boto3.Session()
-        self.sts = self.session.client('sts')
+    # Number of classified entries a streaming scan hands to the preview at a time
+    stream_chunk_size = 100
+
+    # Seconds a streaming scan waits on a full output queue before checking whether the run was cancelled
+    stream_put_timeout = 0.5
+
+    # Default cap on concurrent apply batches across all services
+    apply_workers = 8
+
+    # Seconds the event daemon collects events (at most event_batch_size of them)
+    # after the first one, so resources created together are tagged in one batch
+    event_batch_window = 5.0
+    event_batch_size = 1000
+
+    # Seconds a daemon receive waits for an event (SQS long polling allows up to 20)
+    event_wait_time = 20
+
+    # Number of recently seen resources remembered to drop duplicate and redelivered events
+    recent_events_size = 10000
+
+    def __init__(self, config_file: str = 'tagging_resources_conf.json', max_workers: Optional[int] = None,
+                 scan_backend: str = 'handlers', verify_age: Optional[float] = None,
+                 regions: Optional[List[str]] = None,
+                 session_factory: Optional[Callable[[Optional[str]], boto3.Session]] = None,
+                 inventory: Optional[InventoryCache] = None, refresh: Optional[List[str]] = None,
+                 synthesize_arns: bool = True, journal: Optional[ApplyJournal] = None):
+        # Builds a session for a region (None: the default one); multi-account runs
+        # pass one that hands out assumed-role sessions for the target account
+        self.session_factory = session_factory or (lambda region: boto3.Session(region_name=region))
+        self.session = self.session_factory(None)
+        self.home_region = self.session.region_name
+        self.sessions = {self.home_region: self.session}
+        self.max_workers = max_workers
+        self.scan_backend = scan_backend
+        self.verify_age = verify_age
+        self.synthesize_arns = synthesize_arns
+        # Resources are read from / written to the inventory cache when one is given;
+        # services in refresh (or every service, with 'all') are always rescanned
+        self.inventory = inventory
+        self.refresh = {service_name.lower() for service_name in refresh or []}
+        # Outcomes of applied changes are recorded here when given, for --resume
+        self.journal = journal
+        self.tag_index: Dict[str, Dict[str, Dict[str, Dict[str, str]]]] = {}
+        # Before the tool's own clients are created, so --stats counts their calls too
+        API_STATS.install(self.session)
+        self.sts = CLIENT_POOL.client(self.session, 'sts')
+        self.context: Optional[RunContext] = None
         self.config = self._load_config(config_file)
-        self.changes: List[Tuple[str, str, str, str]] = []
-        self.no_changes: List[Tuple[str, str, str, str]] = []
-        self.service_handlers = {}
+        self.regions = self._resolve_regions(regions)
+        # Indexed by (SERVICE, region); iterating yields (SERVICE, resource_id, tag_key, tag_value, region)
+        self.changes = ChangeSet()
+        self.no_changes = ChangeSet()
+        self.service_handlers: Dict[Tuple[str, str], Any] = {}
+        # (service_name, resource_id) of the resources the event daemon has seen, oldest first
+        self.recent_events: Dict[Tuple[str, str], None] = {}
 
     def _load_config(self, config_file: str) -> Dict[str, bool]:
         """Load the configuration file."""
@@ -31,100 +148,557 @@ class AWSTaggingTool:
             print(f"{Fore.RED}Error: Invalid JSON in config file.{Style.RESET_ALL}")
             sys.exit(1)
 
+    def _get_context(self) -> RunContext:
+        """Resolve the account, partition and region once for the whole run."""
+        if self.context is None:
+            self.context = RunContext.from_identity(self.sts.get_caller_identity(), self.session.region_name)
+        return self.context
+
     def get_caller_identity(self) -> None:
         """Display the current AWS account and user information."""
         try:
-            identity = self.sts.get_caller_identity()
-            account_id = identity.get('Account', 'N/A')
-            user_arn = identity.get('Arn', 'N/A')
-            print(f"{Fore.CYAN}Using AWS Account ID: {account_id}"){
-                "lambda": true,
-                "ec2": true,
-                "vpc": true,
-                "s3": true,
-                "eks": true,
-                "elb": true,
-                "opensearch": true,
-                "kinesis": false,
-                "rds": false,
-                "dynamodb": false,
-                "sqs": false,
-                "sns": false,
-                "apigateway": false
-            }
+            context = self._get_context()
+            account_id = context.account_id or 'N/A'
+            user_arn = context.caller_arn or 'N/A'
+            print(f"{Fore.CYAN}Using AWS Account ID: {account_id}")
             print(f"User ARN: {user_arn}{Style.RESET_ALL}\n")
         except ClientError as e:
             print(f"{Fore.RED}Error getting caller identity: {e}{Style.RESET_ALL}")
             sys.exit(1)
 
-    def _get_service_handler(self, service_name: str) -> Any:
-        """Get the appropriate service handler for the given service name."""
-        if service_name not in self.service_handlers:
+    def _get_service_handler(self, service_name: str, region: Optional[str] = None,
+                             session: Optional[boto3.Session] = None) -> Any:
+        """Get the appropriate service handler for the given service name and region."""
+        region = region or self.home_region
+        key = (service_name, region)
+        if key not in self.service_handlers:
             try:
-                # Dynamically import the service module
-                module_name = f"aws_services.{service_name}_service"
-                module = importlib.import_module(module_name)
-                
-                # The class name is expected to be {SERVICENAME}Service (e.g., VPCService, EC2Service)
-                # Convert service_name to uppercase for consistency
-                class_name = f"{service_name.upper()}Service" if len(service_name) <= 3 else f"{service_name.capitalize()}Service"
-                service_class = getattr(module, class_name)
-                
                 # Create and cache the handler
-                self.service_handlers[service_name] = service_class(self.session)
-            except (ImportError, AttributeError) as e:
+                context = self._get_context().for_region(region)
+                handler = get_service_handler(service_name, session or self._get_session(region), context)
+                handler.snapshot_max_age = self.verify_age
+                handler.synthesize_arns = self.synthesize_arns
+                handler.inventory = self.inventory
+                self.service_handlers[key] = handler
+            except ValueError as e:
                 print(f"{Fore.YELLOW}Warning: Could not load handler for {service_name}: {e}{Style.RESET_ALL}")
                 return None
                 
-        return self.service_handlers.get(service_name)
+        return self.service_handlers.get(key)
 
-    def process_resources(self) -> None:
-        """Process all resources based on the configuration."""
-        for service_name, enabled in self.config.items():
-            if not enabled:
-                continue
-                
-            handler = self._get_service_handler(service_name)
-            if not handler:
-                continue
-                
+    def _get_session(self, region: str) -> boto3.Session:
+        """Get the main-thread session for a region."""
+        if region not in self.sessions:
+            self.sessions[region] = self.session_factory(region)
+        return self.sessions[region]
+
+    def _new_session(self, region: str) -> boto3.Session:
+        """Create an independent session for a worker thread.
+
+        boto3 sessions are not thread-safe, so every concurrent scan gets its own
+        session (and therefore its own clients) resolved the same way as the main one.
+        """
+        return self.session_factory(region)
+
+    def _resolve_regions(self, regions: Optional[List[str]]) -> List[str]:
+        """Expand the requested regions; 'all' means every region enabled for the account."""
+        if not regions:
+            return [self.home_region]
+        if 'all' in regions:
+            return list_enabled_regions(self.session)
+        return list(dict.fromkeys(regions))
+
+    def _scan_units(self, service_names: List[str]) -> List[Tuple[str, str]]:
+        """List the (service_name, region) pairs to scan, in output order.
+
+        Global services (such as S3) are scanned once, from the home region.
+        """
+        units = []
+        for service_name in service_names:
+            service_class = SERVICE_REGISTRY.get(service_name)
+            if service_class is not None and service_class.is_global:
+                units.append((service_name, self.home_region))
+            else:
+                units.extend((service_name, region) for region in self.regions)
+        return units
+
+    def _scan_service(self, unit: Tuple[str, str],
+                      session: Optional[boto3.Session] = None) -> Tuple[ChangeSet, ChangeSet]:
+        """Scan a single service in a single region and return its (changes, no_changes)."""
+        service_name, region = unit
+        changes, no_changes = ChangeSet(), ChangeSet()
+        handler = self._get_service_handler(service_name, region, session)
+        if not handler:
+            return changes, no_changes
+        handler.tag_index = self.tag_index.get(region, {}).get(service_name)
+
+        try:
+            with API_STATS.track(service_name, 'scan'):
+                resources = () if self.inventory is None else self._get_resources(handler, service_name, region)
+                for (resource_type, resource_id, tag_key, tag_value), needs_change in handler.iter_changes(*resources):
+                    # Entries are kept with their region so apply can route them to the right client
+                    (changes if needs_change else no_changes).add(resource_type, resource_id, tag_key, tag_value, region)
+        except Exception as e:
+            print(f"{Fore.YELLOW}Error processing {service_name} in {region}: {e}{Style.RESET_ALL}")
+            return ChangeSet(), ChangeSet()
+
+        return changes, no_changes
+
+    def _get_resources(self, handler: Any, service_name: str, region: str) -> Tuple[List, Optional[float]]:
+        """Get a service's resources from the inventory cache, scanning (and caching) them when stale.
+
+        Returns (resources, fetched_at). fetched_at is None for cached resources: their
+        tags may have changed since, so they are not kept as the scan snapshot and the
+        handlers read the tags again before writing.
+        """
+        account_id = self._get_context().account_id
+        if service_name not in self.refresh and 'all' not in self.refresh:
+            cached = self.inventory.load(account_id, region, service_name)
+            if cached is not None:
+                resources, fetched_at = cached
+                print(f"{Fore.CYAN}Using cached {service_name} inventory for {region} "
+                      f"({time.time() - fetched_at:.0f}s old){Style.RESET_ALL}")
+                return resources, None
+
+        fetched_at = time.time()
+        resources = handler.get_resources()
+        self.inventory.store(account_id, region, service_name, resources, fetched_at)
+        return resources, fetched_at
+
+    def _scan_service_in_worker(self, unit: Tuple[str, str]) -> Tuple[ChangeSet, ChangeSet]:
+        """Scan a single service from a worker thread using a dedicated session."""
+        return self._scan_service(unit, self._new_session(unit[1]))
+
+    def _load_tag_index(self, service_names: List[str]) -> None:
+        """Fetch tags in bulk through the Resource Groups Tagging API, per region.
+
+        Services the API does not cover keep no index, so their handlers fall back
+        to per-resource tag calls. On error every handler in that region falls back.
+        """
+        for region in self.regions:
+            context = self._get_context().for_region(region)
             try:
-                changes, no_changes = handler.process_resources()
-                self.changes.extend(changes)
-                self.no_changes.extend(no_changes)
-            except Exception as e:
-                print(f"{Fore.YELLOW}Error processing {service_name}: {e}{Style.RESET_ALL}")
-
-    def apply_changes(self) -> None:
-        """Apply all pending tag changes."""
+                with API_STATS.track('tagging-api', 'scan'):
+                    self.tag_index[region] = TaggingAPIScanner(self._get_session(region), context).scan(service_names)
+            except ClientError as e:
+                print(f"{Fore.YELLOW}Warning: Tagging API scan failed in {region}, "
+                      f"falling back to per-resource calls: {e}{Style.RESET_ALL}")
+
+    def process_resources(self) -> None:
+        """Process all resources based on the configuration.
+
+        Every enabled service is scanned in every selected region. With more than one
+        worker the scans run in parallel; results are merged in configuration order
+        (then region order) so the preview output is stable.
+        """
+        service_names = [service_name for service_name, enabled in self.config.items() if enabled]
+        units = self._scan_units(service_names)
+
+        if self.scan_backend == 'tagging-api':
+            self._load_tag_index(service_names)
+
+        # Default to one worker per region, which keeps single-region runs sequential
+        max_workers = self.max_workers or len(self.regions)
+        if max_workers > 1 and len(units) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self._scan_service_in_worker, units))
+        else:
+            results = [self._scan_service(unit) for unit in units]
+
+        for changes, no_changes in results:
+            self.changes.update(changes)
+            self.no_changes.update(no_changes)
+
+    def apply_changes(self, max_workers: Optional[int] = None) -> Dict[Tuple[str, str], str]:
+        """Apply all pending tag changes.
+
+        Changes are applied in batches of handler.batch_size on up to max_workers
+        threads (default: apply_workers), with at most handler.apply_concurrency
+        batches of a service in flight, since tagging APIs have very different
+        rate limits. Results are printed in plan order whatever order batches
+        finish in, followed by a per-service summary. When a service is denied
+        access, its remaining batches are skipped. With a journal, every change is
+        journaled before the first write and its outcome as soon as its batch completes.
+
+        Returns {(resource_type, resource_id): outcome} ('applied', 'skipped' or
+        'failed') for every change attempted; changes without a handler are left out.
+        """
+        outcomes: Dict[Tuple[str, str], str] = {}
         if not self.changes:
             print(f"{Fore.YELLOW}No changes to apply.{Style.RESET_ALL}")
-            return
+            return outcomes
 
-        print("\\nApplying changes...")
-        
-        # Group changes by resource type for more efficient processing
-        changes_by_type = {}
-        for change in self.changes:
-            resource_type = change[0].lower()
-            if resource_type not in changes_by_type:
-                changes_by_type[resource_type] = []
-            changes_by_type[resource_type].append(change[1:])  # Remove the resource type
-        
-        # Apply changes by resource type
-        for resource_type, resources in changes_by_type.items():
-            handler = self._get_service_handler(resource_type)
+        print("\nApplying changes...")
+        if self.journal is not None:
+            self.journal.add(self._get_context().account_id, self.changes)
+
+        # Batches in plan order, each with the handler for its resource type and region
+        batches = []
+        for group in self.changes.groups.values():
+            resource_type = group.service.lower()
+            handler = self._get_service_handler(resource_type, group.region)
             if not handler:
                 print(f"{Fore.RED}No handler found for resource type: {resource_type}{Style.RESET_ALL}")
                 continue
-                
-            for resource in resources:
-                resource_id, tag_key, tag_value = resource
-                try:
-                    if handler.apply_tags(resource_id, {tag_key: tag_value}):
-                        print(f"{Fore.GREEN}Applied tag {tag_key}={tag_value} to {resource_type.upper()} {resource_id}{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.RED}Error applying tag to {resource_type} {resource_id}: {e}{Style.RESET_ALL}")
+            # Apply in batches so handlers with multi-resource APIs can group writes
+            batches.extend((handler, resource_type, group.region, batch) for batch in group.batches(handler.batch_size))
+
+        summary: Dict[str, Dict[str, int]] = {}
+        max_workers = max(1, max_workers or self.apply_workers)
+        try:
+            with ACCESS_DENIED.scope(), ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for index, results in self._run_batches(executor, max_workers, batches):
+                    handler, resource_type, region, batch = batches[index]
+                    counts = summary.setdefault(resource_type, {'applied': 0, 'skipped': 0, 'failed': 0})
+                    for outcome, count in self._report_batch(resource_type, batch, results).items():
+                        counts[outcome] += count
+                    for resource_id, _, _ in batch:
+                        outcomes[(resource_type, resource_id)] = self._outcome(results, resource_id)
+        finally:
+            # Keep the outcomes reported so far, even when interrupted
+            if self.journal is not None:
+                self.journal.sync()
+
+        self._print_apply_summary(summary)
+        return outcomes
+
+    def _run_batches(self, executor: ThreadPoolExecutor, max_workers: int,
+                     batches: List[Tuple[Any, str, str, List[Tuple[str, str, str]]]]):
+        """Run batches on executor within the global and per-service limits.
+
+        Yields (index, results) in batch order; results is None for a batch
+        skipped because its service was denied access.
+        """
+        pending: Dict[str, deque] = {}
+        for index, (handler, resource_type, _, _) in enumerate(batches):
+            pending.setdefault(resource_type, deque()).append(index)
+        in_flight: Dict[str, int] = dict.fromkeys(pending, 0)
+        running: Dict[Future, int] = {}
+        done_results: Dict[int, Any] = {}
+        next_index = 0
+
+        while next_index < len(batches):
+            # Start every batch the limits allow, round-robin over services
+            started = True
+            while started and len(running) < max_workers:
+                started = False
+                for resource_type, indexes in pending.items():
+                    if not indexes:
+                        continue
+                    if resource_type in ACCESS_DENIED.denied:
+                        done_results.update(dict.fromkeys(indexes))
+                        indexes.clear()
+                        continue
+                    handler = batches[indexes[0]][0]
+                    if in_flight[resource_type] >= handler.apply_concurrency or len(running) >= max_workers:
+                        continue
+                    index = indexes.popleft()
+                    in_flight[resource_type] += 1
+                    # In a copy of this context, so the batch's denials are recorded in this run's scope
+                    future = executor.submit(contextvars.copy_context().run, self._run_batch, *batches[index])
+                    # Journaled as soon as it completes, even if the run is interrupted before it is reported
+                    future.add_done_callback(partial(self._journal_future, batches[index]))
+                    running[future] = index
+                    started = True
+
+            if next_index not in done_results:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    in_flight[batches[index][1]] -= 1
+                    done_results[index] = future.result()
+
+            # Report in plan order, as far as batches have finished
+            while next_index in done_results:
+                yield next_index, done_results.pop(next_index)
+                next_index += 1
+
+    def _journal_future(self, batch: Tuple[Any, str, str, List[Tuple[str, str, str]]], future: Future) -> None:
+        """Done callback journaling the outcome of a batch run by _run_batches."""
+        if not future.cancelled() and future.exception() is None:
+            _, resource_type, region, resources = batch
+            self._journal_batch(resource_type, region, resources, future.result())
+
+    def _run_batch(self, handler: Any, resource_type: str, region: str,
+                   batch: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+        """Apply one batch of (resource_id, tag_key, tag_value) through handler; returns {resource_id: result}."""
+        try:
+            with API_STATS.track(resource_type, 'apply'):
+                results = handler.apply_tags_batch(
+                    [(resource_id, {tag_key: tag_value}) for resource_id, tag_key, tag_value in batch]
+                )
+        except Exception as e:
+            results = {resource_id: e for resource_id, _, _ in batch}
+
+        # Their cached tags are out of date now (even after a failure, some may have been written)
+        if self.inventory is not None:
+            self.inventory.invalidate(self._get_context().account_id, region, resource_type,
+                                      [resource_id for resource_id, _, _ in batch])
+        return results
+
+    @staticmethod
+    def _outcome(results: Optional[Dict[str, Any]], resource_id: str) -> str:
+        """'applied', 'failed' or 'skipped' (batch or resource not attempted after an access denied)."""
+        if results is None or resource_id not in results:
+            return 'skipped'
+        result = results[resource_id]
+        return 'applied' if result and not isinstance(result, Exception) else 'failed'
+
+    def _journal_batch(self, resource_type: str, region: str, batch: List[Tuple[str, str, str]],
+                       results: Optional[Dict[str, Any]]) -> None:
+        """Record the outcome of every resource of a batch in the journal, if there is one."""
+        if self.journal is None:
+            return
+        account_id = self._get_context().account_id
+        for resource_id, tag_key, tag_value in batch:
+            self.journal.record(account_id, region, resource_type, resource_id, tag_key, tag_value,
+                                self._outcome(results, resource_id))
+
+    def _report_batch(self, resource_type: str, batch: List[Tuple[str, str, str]],
+                      results: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """Print the outcome of every resource of a batch; returns its applied/skipped/failed counts.
+
+        results is None for a batch that was skipped.
+        """
+        counts = {'applied': 0, 'skipped': 0, 'failed': 0}
+        if results is None:
+            counts['skipped'] = len(batch)
+            print(f"{Fore.YELLOW}Skipped {len(batch)} {resource_type.upper()} resources: "
+                  f"access denied ({ACCESS_DENIED.denied.get(resource_type)}){Style.RESET_ALL}")
+            return counts
+
+        # Report every resource individually, even when it was written as part of a batch
+        for resource_id, tag_key, tag_value in batch:
+            outcome = self._outcome(results, resource_id)
+            counts[outcome] += 1
+            result = results.get(resource_id)
+            if outcome == 'skipped':
+                # Not attempted: the service was denied access earlier in the batch
+                print(f"{Fore.YELLOW}Skipped {resource_type} {resource_id}: access denied{Style.RESET_ALL}")
+            elif isinstance(result, Exception):
+                print(f"{Fore.RED}Error applying tag to {resource_type} {resource_id}: {result}{Style.RESET_ALL}")
+            elif outcome == 'applied':
+                print(f"{Fore.GREEN}Applied tag {tag_key}={tag_value} to {resource_type.upper()} {resource_id}{Style.RESET_ALL}")
+            # Otherwise the handler has printed why it failed
+        return counts
+
+    def _print_apply_summary(self, summary: Dict[str, Dict[str, int]]) -> None:
+        """Print the applied, skipped and failed counts of every service."""
+        print(f"\n{Fore.CYAN}Apply summary:{Style.RESET_ALL}")
+        for resource_type, counts in summary.items():
+            color = Fore.RED if counts['failed'] else Fore.YELLOW if counts['skipped'] else Fore.GREEN
+            print(f"{color}  {resource_type.upper()}: {counts['applied']} applied, {counts['skipped']} skipped, "
+                  f"{counts['failed']} failed{Style.RESET_ALL}")
+
+    def _apply_batch(self, handler: Any, resource_type: str, region: str, batch: List[Tuple[str, str, str]]) -> None:
+        """Apply one batch through handler, then journal and report every resource."""
+        results = self._run_batch(handler, resource_type, region, batch)
+        self._journal_batch(resource_type, region, batch, results)
+        self._report_batch(resource_type, batch, results)
+
+    def _stream_service_in_worker(self, unit: Tuple[str, str], output: queue.Queue,
+                                  cancelled: threading.Event) -> None:
+        """Scan a single service from a worker thread, passing classified entries to output in chunks.
+
+        A None is put on output once the service is done, even if its scan failed.
+        The scan stops as soon as cancelled is set.
+        """
+        service_name, region = unit
+        try:
+            handler = self._get_service_handler(service_name, region, self._new_session(region))
+            if handler:
+                handler.tag_index = self.tag_index.get(region, {}).get(service_name)
+                chunk = []
+                with API_STATS.track(service_name, 'scan'):
+                    for entry, needs_change in handler.iter_changes():
+                        if cancelled.is_set():
+                            return
+                        chunk.append((entry + (region,), needs_change))
+                        if len(chunk) >= self.stream_chunk_size:
+                            if not self._stream_put(output, (handler, chunk), cancelled):
+                                return
+                            chunk = []
+                if chunk:
+                    self._stream_put(output, (handler, chunk), cancelled)
+        except Exception as e:
+            print(f"{Fore.YELLOW}Error processing {service_name} in {region}: {e}{Style.RESET_ALL}")
+        finally:
+            self._stream_put(output, None, cancelled)
+
+    def _stream_put(self, output: queue.Queue, item: Any, cancelled: threading.Event) -> bool:
+        """Put item on output, waiting while it is full; returns False if cancelled first."""
+        while not cancelled.is_set():
+            try:
+                output.put(item, timeout=self.stream_put_timeout)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def stream_resources(self, auto_apply: bool = False) -> Tuple[int, int]:
+        """Scan, preview and optionally apply resources as they are found.
+
+        Unlike process_resources, nothing is kept once a resource has been printed
+        (and, with auto_apply, tagged in a batch of handler.batch_size), so memory
+        stays bounded whatever the inventory size. Entries are printed in the order
+        the scans produce them. Returns the number of resources that needed the tag
+        and the number that already had it.
+        """
+        service_names = [service_name for service_name, enabled in self.config.items() if enabled]
+        units = self._scan_units(service_names)
+
+        if self.scan_backend == 'tagging-api':
+            self._load_tag_index(service_names)
+
+        max_workers = self.max_workers or len(self.regions)
+        # Bounded, so scans wait for the preview (and apply) to catch up
+        output = queue.Queue(maxsize=4 * max_workers)
+        counts = {True: 0, False: 0}
+        pending: Dict[Any, List[Tuple[str, str, str]]] = {}
+
+        cancelled = threading.Event()
+
+        with ACCESS_DENIED.scope(), ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for unit in units:
+                executor.submit(self._stream_service_in_worker, unit, output, cancelled)
+
+            try:
+                finished = 0
+                while finished < len(units):
+                    item = output.get()
+                    if item is None:
+                        finished += 1
+                        continue
+                    handler, chunk = item
+                    for (resource_type, resource_id, tag_key, tag_value, region), needs_change in chunk:
+                        counts[needs_change] += 1
+                        color = Fore.YELLOW if needs_change else Fore.GREEN
+                        print(f"{color}{self._group_label(resource_type, region)}{Style.RESET_ALL} "
+                              f"{resource_id}: {tag_key} = {tag_value}")
+                        if not needs_change:
+                            continue
+                        if not auto_apply:
+                            handler.tag_snapshot.pop(resource_id, None)
+                            continue
+                        batch = pending.setdefault(handler, [])
+                        batch.append((resource_id, tag_key, tag_value))
+                        if len(batch) >= handler.batch_size:
+                            self._apply_pending(handler, pending.pop(handler))
+
+                for handler, batch in pending.items():
+                    self._apply_pending(handler, batch)
+            finally:
+                # Before the executor waits for the workers: if this loop stopped early
+                # (an error, or Ctrl-C), workers blocked on the full queue would never return
+                cancelled.set()
+                while True:
+                    try:
+                        output.get_nowait()
+                    except queue.Empty:
+                        break
+
+        return counts[True], counts[False]
+
+    def process_events(self, source: Any, drain: bool = False) -> int:
+        """Tag the resources created according to the events of source, as they arrive.
+
+        source is an events.SQSEventSource or events.FileEventSource. Events are
+        collected for event_batch_window seconds after the first one, turned into
+        changes for the services enabled in the configuration (dropping resources
+        seen recently and ones named at creation) and applied like a scan's changes.
+        Only events whose resources were all tagged are then acknowledged; the
+        others stay on the queue, to be delivered again after its visibility
+        timeout (or moved to its dead-letter queue). Runs until interrupted, or
+        with drain, until the source has nothing left. Returns the number of
+        events acknowledged.
+        """
+        wait_time = 1 if drain else self.event_wait_time
+        handled = 0
+        while True:
+            events = source.receive(wait_time)
+            if not events:
+                if drain:
+                    return handled
+                continue
+
+            deadline = time.monotonic() + self.event_batch_window
+            while len(events) < self.event_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                events.extend(source.receive(remaining))
+
+            self.changes, writes = self._event_changes([event for event, _ in events])
+            print(f"{Fore.CYAN}{len(events)} events, {len(self.changes)} resources to tag{Style.RESET_ALL}")
+            outcomes = self.apply_changes() if self.changes else {}
+
+            # Only now, and only for events fully tagged: events of a daemon that dies
+            # while applying, or whose resources could not be tagged yet (often not
+            # found just after creation), are delivered again
+            done = [(receipt, keys) for (_, receipt), keys in zip(events, writes)
+                    if all(outcomes.get(key) == 'applied' for key in keys)]
+            for _, keys in done:
+                for key in keys:
+                    self._remember_event(key)
+            source.ack([receipt for receipt, _ in done if receipt is not None])
+            handled += len(done)
+            if len(done) < len(events):
+                print(f"{Fore.YELLOW}{len(events) - len(done)} events not acknowledged: "
+                      f"their resources could not all be tagged{Style.RESET_ALL}")
+
+    def _event_changes(self, events: List[Any]) -> Tuple[ChangeSet, List[List[Tuple[str, str]]]]:
+        """The Name changes for the resources created according to events.
+
+        Returns (changes, writes), where writes holds the (resource_type, resource_id)
+        of the changes each event needs, in event order. Resources named at creation
+        need none and are recorded in recent_events straight away; the others once
+        their change has been applied.
+        """
+        changes = ChangeSet()
+        writes: List[List[Tuple[str, str]]] = []
+        pending = set()
+        context = self._get_context()
+        for event in events:
+            keys = []
+            writes.append(keys)
+            if not isinstance(event, dict):
+                continue
+            for service_name, region, (resource_id, resource_name, tags) in created_resources(event, context):
+                service_class = SERVICE_REGISTRY.get(service_name)
+                if not self.config.get(service_name) or service_class is None:
+                    continue
+                key = (service_name, resource_id)
+                if key in self.recent_events:
+                    continue
+                if tags.get('Name', '') == resource_name:
+                    self._remember_event(key)
+                    continue
+                keys.append(key)
+                if key in pending:
+                    # Already in this batch (duplicate delivery)
+                    continue
+                pending.add(key)
+                # Global services (S3) are handled from the home region, as when scanning
+                changes.add(service_name.upper(), resource_id, 'Name', resource_name,
+                            self.home_region if service_class.is_global else region)
+        return changes, writes
+
+    def _remember_event(self, key: Tuple[str, str]) -> None:
+        """Record a handled (resource_type, resource_id) in recent_events, forgetting the oldest past recent_events_size."""
+        self.recent_events[key] = None
+        if len(self.recent_events) > self.recent_events_size:
+            # Dicts keep insertion order: forget the oldest
+            del self.recent_events[next(iter(self.recent_events))]
+
+    def _apply_pending(self, handler: Any, batch: List[Tuple[str, str, str]]) -> None:
+        """Apply a streamed batch and drop its scan snapshots."""
+        self._apply_batch(handler, handler.service_name, handler.context.region, batch)
+        for resource_id, _, _ in batch:
+            handler.tag_snapshot.pop(resource_id, None)
+
+    def plan_records(self) -> List[Tuple[str, ChangeSet]]:
+        """(account_id, changes) pairs for write_plan."""
+        return [(self._get_context().account_id, self.changes)]
 
     def print_changes(self) -> None:
         """Print the changes that will be made."""
@@ -136,43 +710,360 @@ class AWSTaggingTool:
             print(f"\\n{Fore.GREEN}The following resources are already correctly tagged:{Style.RESET_ALL}")
             self._print_resources(self.no_changes, Fore.GREEN)
 
-    def _print_resources(self, resources: List[Tuple[str, str, str, str]], color: str) -> None:
-        """Print resources grouped by resource type."""
-        # Group by resource type
-        resources_by_type = {}
-        for resource in resources:
-            resource_type = resource[0]
-            if resource_type not in resources_by_type:
-                resources_by_type[resource_type] = []
-            resources_by_type[resource_type].append(resource[1:])  # Remove the resource type
-        
-        # Print by resource type
-        for resource_type, items in resources_by_type.items():
-            print(f"\\n{color}{resource_type} ({len(items)}):{Style.RESET_ALL}")
-            for item in items:
-                resource_id, tag_key, tag_value = item
+    def _print_resources(self, resources: ChangeSet, color: str) -> None:
+        """Print resources grouped by resource type (and region, when scanning several)."""
+        for group in resources.groups.values():
+            print(f"\\n{color}{self._group_label(group.service, group.region)} ({len(group)}):{Style.RESET_ALL}")
+            for resource_id, tag_key, tag_value in group:
                 print(f"  {resource_id}: {tag_key} = {tag_value}")
 
-def main():
+    def _group_label(self, resource_type: str, region: str) -> str:
+        """Label for a resource type, naming the region when several are scanned."""
+        return f"{resource_type} [{region}]" if len(self.regions) > 1 else resource_type
+
+class OrganizationTaggingTool:
+    """Run an AWSTaggingTool in each of several accounts through an assumed role."""
+
+    def __init__(self, config_file: str = 'tagging_resources_conf.json', account_ids: Optional[List[str]] = None,
+                 role_name: str = 'OrganizationAccountAccessRole', account_workers: int = 4, **tool_options: Any):
+        self.session = boto3.Session()
+        API_STATS.install(self.session)
+        self.sts = CLIENT_POOL.client(self.session, 'sts')
+        self.account_workers = max(1, account_workers)
+        try:
+            self.context = RunContext.from_identity(self.sts.get_caller_identity(), self.session.region_name)
+            account_ids = account_ids or list_organization_accounts(self.session)
+        except ClientError as e:
+            print(f"{Fore.RED}Error resolving accounts: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+
+        # Resolve 'all' once from the calling account rather than once per account
+        regions = tool_options.pop('regions', None)
+        if regions and 'all' in regions:
+            regions = list_enabled_regions(self.session)
+
+        # One tool per account; each keeps its assumed-role sessions (and handlers)
+        # from the scan through the apply phase. Roles are only assumed when an
+        # account is first used, from its worker (see _is_reachable).
+        self.tools: Dict[str, AWSTaggingTool] = {}
+        for account_id in dict.fromkeys(account_ids):
+            if account_id == self.context.account_id:
+                session_factory = None
+            else:
+                assumed = AssumedRoleSessions(self.sts, account_id, role_name, self.context.partition)
+                session_factory = assumed.session
+            try:
+                self.tools[account_id] = AWSTaggingTool(config_file, regions=regions,
+                                                        session_factory=session_factory, **tool_options)
+            except ClientError as e:
+                print(f"{Fore.YELLOW}Skipping account {account_id}: {e}{Style.RESET_ALL}")
+
+    @property
+    def changes(self) -> List[ChangeSet]:
+        """The non-empty change sets, one per account with pending changes."""
+        return [tool.changes for tool in self.tools.values() if tool.changes]
+
+    def get_caller_identity(self) -> None:
+        """Display the calling identity and the accounts that will be scanned."""
+        print(f"{Fore.CYAN}Using AWS Account ID: {self.context.account_id or 'N/A'}")
+        print(f"User ARN: {self.context.caller_arn or 'N/A'}")
+        print(f"Target accounts ({len(self.tools)}): {', '.join(self.tools)}{Style.RESET_ALL}\n")
+
+    def _is_reachable(self, account_id: str) -> bool:
+        """Assume the role in one account; an unreachable account is reported and skipped."""
+        try:
+            self.tools[account_id]._get_context()
+            return True
+        except ClientError as e:
+            print(f"{Fore.YELLOW}Skipping account {account_id}: {e}{Style.RESET_ALL}")
+            return False
+
+    def _scan_account(self, account_id: str) -> None:
+        """Scan one account."""
+        if self._is_reachable(account_id):
+            self.tools[account_id].process_resources()
+
+    def _stream_account(self, account_id: str, auto_apply: bool) -> Tuple[int, int]:
+        """Stream one account's resources (see AWSTaggingTool.stream_resources)."""
+        if not self._is_reachable(account_id):
+            return 0, 0
+        return self.tools[account_id].stream_resources(auto_apply)
+
+    def _map_accounts(self, func: Callable[[str], Any]) -> List[Any]:
+        """Call func for every account, at most account_workers at a time."""
+        if self.account_workers > 1 and len(self.tools) > 1:
+            with ThreadPoolExecutor(max_workers=self.account_workers) as executor:
+                return list(executor.map(func, self.tools))
+        return [func(account_id) for account_id in self.tools]
+
+    def process_resources(self) -> None:
+        """Scan all accounts, at most account_workers at a time."""
+        self._map_accounts(self._scan_account)
+
+    def stream_resources(self, auto_apply: bool = False) -> Tuple[int, int]:
+        """Stream all accounts, at most account_workers at a time; returns the summed counts."""
+        counts = self._map_accounts(lambda account_id: self._stream_account(account_id, auto_apply))
+        return sum(changed for changed, _ in counts), sum(unchanged for _, unchanged in counts)
+
+    def print_changes(self) -> None:
+        """Print the preview of every account, one section per account."""
+        for account_id, tool in self.tools.items():
+            if tool.changes or tool.no_changes:
+                print(f"\\n{Fore.CYAN}=== Account {account_id} ==={Style.RESET_ALL}")
+                tool.print_changes()
+
+    def apply_changes(self, max_workers: Optional[int] = None) -> None:
+        """Apply the pending changes of every account with its own sessions."""
+        for account_id, tool in self.tools.items():
+            if tool.changes and self._is_reachable(account_id):
+                print(f"\\n{Fore.CYAN}=== Account {account_id} ==={Style.RESET_ALL}")
+                tool.apply_changes(max_workers)
+
+    def plan_records(self) -> List[Tuple[str, ChangeSet]]:
+        """(account_id, changes) of every account with pending changes, for write_plan."""
+        return [(account_id, tool.changes) for account_id, tool in self.tools.items() if tool.changes]
+
+def add_run_arguments(parser: argparse.ArgumentParser, defaults: bool = True) -> None:
+    """Add the options shared by every mode.
+
+    Subcommands add them again with ``defaults=False``, so they can also be given
+    after the subcommand without resetting values given before it.
+    """
+    def default(value: Any) -> Any:
+        return value if defaults else argparse.SUPPRESS
+
+    parser.add_argument('--config', default=default('tagging_resources_conf.json'),
+                        help='Path to the services configuration file')
+    parser.add_argument('--workers', type=int, default=default(None),
+                        help='Number of service scans (or, for apply, batches) to run concurrently '
+                             '(default: one scan per region, 8 apply batches)')
+    parser.add_argument('--regions', nargs='+', metavar='REGION', default=default(None),
+                        help="Regions to scan, or 'all' for every enabled region (default: the session's region)")
+    parser.add_argument('--scan-backend', choices=['handlers', 'tagging-api'], default=default('handlers'),
+                        help='Where resource tags are read from: per-resource handler calls, or one '
+                             'bulk Resource Groups Tagging API sweep (default: handlers)')
+    parser.add_argument('--verify-age', type=float, metavar='SECONDS', default=default(None),
+                        help='Re-read tags before writing when the scan results are older than SECONDS '
+                             '(default: always reuse the tags read during the scan)')
+    parser.add_argument('--describe-arns', action='store_true', default=default(False),
+                        help='Read ARNs with a describe call per resource instead of building them from '
+                             'the account, partition and region (slower, for unusual endpoints)')
+    parser.add_argument('--cache-ttl', type=float, default=default(900), metavar='SECONDS',
+                        help='Reuse cached service inventories younger than SECONDS (default: 900)')
+    parser.add_argument('--cache-dir', default=default(default_cache_dir()),
+                        help=f'Directory of the inventory cache (default: {default_cache_dir()})')
+    parser.add_argument('--no-cache', action='store_true', default=default(False),
+                        help='Always scan, without reading or writing the inventory cache')
+    parser.add_argument('--refresh', nargs='+', metavar='SERVICE', default=default([]),
+                        help="Rescan these services even if their cached inventory is fresh ('all' for every service)")
+    accounts = parser.add_mutually_exclusive_group()
+    accounts.add_argument('--accounts', nargs='+', metavar='ACCOUNT_ID', default=default(None),
+                          help='Scan these accounts by assuming --role-name in each of them')
+    accounts.add_argument('--organization', action='store_true', default=default(False),
+                          help="Scan every active account of the caller's AWS Organization")
+    parser.add_argument('--role-name', default=default('OrganizationAccountAccessRole'),
+                        help='Role assumed in each target account (default: OrganizationAccountAccessRole)')
+    parser.add_argument('--account-workers', type=int, default=default(4),
+                        help='Number of accounts to scan concurrently (default: 4)')
+    parser.add_argument('--stats', action='store_true', default=default(False),
+                        help='Print per-API call counts, latencies, retries and throttles at the end of the run')
+    parser.add_argument('--stats-json', metavar='FILE', default=default(None),
+                        help='Also write the --stats report to FILE as JSON (implies --stats)')
+    parser.add_argument('--journal', metavar='FILE', default=default(None),
+                        help='Record every change and its outcome in FILE as it is applied, so an '
+                             'interrupted apply can be continued with --resume FILE')
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Tag AWS resources with a 'Name' tag.")
+    add_run_arguments(parser)
+    parser.add_argument('--stream', action='store_true',
+                        help='Print (and with --yes, apply) resources as they are scanned instead of '
+                             'collecting the whole inventory first; always scans live')
+    parser.add_argument('--yes', action='store_true',
+                        help='Apply the changes without asking for confirmation')
+    parser.add_argument('--resume', metavar='JOURNAL',
+                        help='Without scanning, apply the changes of JOURNAL that were not applied '
+                             '(never attempted, failed or skipped), recording the new outcomes in it')
+
+    # Without a subcommand the tool scans, previews and asks before applying
+    commands = parser.add_subparsers(dest='command', metavar='{plan,apply,daemon}')
+    plan = commands.add_parser('plan', help='Scan and write the pending changes to a plan file, without applying them')
+    add_run_arguments(plan, defaults=False)
+    plan.add_argument('--out', default='tagging-plan.jsonl',
+                      help='Plan file to write (default: tagging-plan.jsonl)')
+    apply = commands.add_parser('apply', help='Apply a plan file without scanning')
+    add_run_arguments(apply, defaults=False)
+    apply.add_argument('--plan', required=True, help='Plan file written by the plan command')
+    apply.add_argument('--shard', type=parse_shard, metavar='INDEX/COUNT',
+                       help='Only apply this shard of the plan (e.g. 0/4), so several runners can split it')
+    apply.add_argument('--max-age', type=float, metavar='SECONDS',
+                       help='Skip changes planned more than SECONDS ago')
+    daemon = commands.add_parser('daemon', help='Tag resources as they are created, from CloudTrail events '
+                                                'instead of scans')
+    add_run_arguments(daemon, defaults=False)
+    source = daemon.add_mutually_exclusive_group(required=True)
+    source.add_argument('--queue-url', help='SQS queue an EventBridge rule sends "AWS API Call via CloudTrail" '
+                                            'events to (directly or through SNS)')
+    source.add_argument('--events-file', metavar='FILE',
+                        help='JSONL file of such events, one per line, read as it grows')
+    daemon.add_argument('--batch-window', type=float, metavar='SECONDS',
+                        help='Seconds to collect events before tagging their resources together '
+                             f'(default: {AWSTaggingTool.event_batch_window:g})')
+    daemon.add_argument('--drain', action='store_true',
+                        help='Exit once the queue or file has no more events instead of waiting for new ones')
+    return parser.parse_args(argv)
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse an INDEX/COUNT shard specification."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected INDEX/COUNT")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', INDEX must be between 0 and COUNT-1")
+    return index, count
+
+def apply_plan(args: argparse.Namespace, tool_options: Dict[str, Any]) -> None:
+    """Apply a plan file through the handlers, without scanning."""
+    try:
+        plan, skipped = read_plan(args.plan, args.shard, args.max_age)
+    except (OSError, ValueError) as e:
+        print(f"{Fore.RED}Error reading plan: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    if skipped:
+        print(f"{Fore.YELLOW}Skipping {skipped} changes planned more than {args.max_age:.0f}s ago.{Style.RESET_ALL}")
+    apply_change_sets(args, tool_options, plan)
+    print(f"{Fore.GREEN}\\nThe plan has been applied.{Style.RESET_ALL}")
+
+def resume_apply(args: argparse.Namespace, tool_options: Dict[str, Any]) -> None:
+    """Apply the changes of the journal that were not applied yet, without scanning."""
+    plan, applied = tool_options['journal'].pending()
+    if applied:
+        print(f"{Fore.YELLOW}Skipping {applied} changes already applied according to {args.resume}.{Style.RESET_ALL}")
+    apply_change_sets(args, tool_options, plan)
+    print(f"{Fore.GREEN}\nThe journal has been resumed.{Style.RESET_ALL}")
+
+def apply_change_sets(args: argparse.Namespace, tool_options: Dict[str, Any], plan: Dict[str, ChangeSet]) -> None:
+    """Apply {account_id: ChangeSet} through the handlers of each account."""
+    if not plan:
+        print(f"{Fore.GREEN}\\nNo changes to apply.{Style.RESET_ALL}")
+        return
+
+    # The plan decides the accounts and regions; each change is applied by its account's tool
+    tool_options['regions'] = sorted({group.region for changes in plan.values() for group in changes.groups.values()})
+    tool = OrganizationTaggingTool(args.config, account_ids=list(plan), role_name=args.role_name,
+                                   account_workers=args.account_workers, **tool_options)
+    for account_id, changes in plan.items():
+        tool.tools[account_id].changes = changes
+    tool.get_caller_identity()
+
+    tool.apply_changes(max_workers=args.workers)
+
+def run_daemon(args: argparse.Namespace, tool_options: Dict[str, Any]) -> None:
+    """Tag resources from creation events until interrupted (or drained)."""
+    if args.accounts or args.organization:
+        print(f"{Fore.RED}The daemon tags the calling account only; events of other accounts are ignored, "
+              f"so --accounts and --organization cannot be used.{Style.RESET_ALL}")
+        sys.exit(1)
+    tool = AWSTaggingTool(args.config, **tool_options)
+    if args.batch_window is not None:
+        tool.event_batch_window = args.batch_window
+    tool.get_caller_identity()
+
+    if args.queue_url:
+        client = CLIENT_POOL.client(tool.session, 'sqs', queue_region(args.queue_url))
+        source = SQSEventSource(client, args.queue_url, tool.event_wait_time)
+        print(f"Waiting for events on {args.queue_url}...")
+    else:
+        try:
+            source = FileEventSource(args.events_file)
+        except OSError as e:
+            print(f"{Fore.RED}Error reading events: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+        print(f"Reading events from {args.events_file}...")
+
+    try:
+        handled = tool.process_events(source, drain=args.drain)
+        print(f"{Fore.GREEN}\nNo more events; handled {handled}.{Style.RESET_ALL}")
+    except KeyboardInterrupt:
+        print(f"{Fore.YELLOW}\nStopped.{Style.RESET_ALL}")
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
     print(f"{Fore.CYAN}=== AWS Resource Tagging Tool ==={Style.RESET_ALL}")
+    # Before any handler exists: the hooks are installed as handlers are created
+    API_STATS.enabled = args.stats or bool(args.stats_json)
     
-    tool = AWSTaggingTool()
+    tool_options = dict(max_workers=args.workers, scan_backend=args.scan_backend,
+                        verify_age=args.verify_age, regions=args.regions, refresh=args.refresh,
+                        synthesize_arns=not args.describe_arns)
+    if not args.no_cache:
+        tool_options['inventory'] = InventoryCache(os.path.join(args.cache_dir, 'inventory.sqlite3'), args.cache_ttl)
+    journal_path = args.resume or args.journal
+    if journal_path:
+        try:
+            tool_options['journal'] = ApplyJournal(journal_path)
+        except (OSError, ValueError) as e:
+            print(f"{Fore.RED}Error opening journal: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+    try:
+        run(args, tool_options)
+    finally:
+        if journal_path:
+            tool_options['journal'].close()
+
+def run(args: argparse.Namespace, tool_options: Dict[str, Any]) -> None:
+    """Scan, preview and apply (or plan, or apply a plan) as the arguments say."""
+    if args.resume:
+        resume_apply(args, tool_options)
+        print_run_report(args)
+        return
+    if args.command == 'apply':
+        apply_plan(args, tool_options)
+        print_run_report(args)
+        return
+    if args.command == 'daemon':
+        run_daemon(args, tool_options)
+        print_run_report(args)
+        return
+
+    if args.accounts or args.organization:
+        tool = OrganizationTaggingTool(args.config, account_ids=args.accounts, role_name=args.role_name,
+                                       account_workers=args.account_workers, **tool_options)
+    else:
+        tool = AWSTaggingTool(args.config, **tool_options)
     tool.get_caller_identity()
     
     print("Scanning resources...")
+    if args.stream:
+        changed, unchanged = tool.stream_resources(auto_apply=args.yes)
+        action = 'were tagged' if args.yes else 'need the tag (run again with --yes to apply)'
+        print(f"{Fore.CYAN}\\n{changed} resources {action}; {unchanged} were already tagged.{Style.RESET_ALL}")
+        print_run_report(args)
+        return
+
     tool.process_resources()
     
     tool.print_changes()
+
+    if args.command == 'plan':
+        count = write_plan(args.out, tool.plan_records())
+        print(f"{Fore.CYAN}\\nWrote {count} changes to {args.out}.{Style.RESET_ALL}")
+        print_run_report(args)
+        return
     
     if tool.changes:
-        apply = input("\\n\nDo you want to apply these changes? (yes/no): ").strip().lower()
+        apply = 'yes' if args.yes else input("\\n\nDo you want to apply these changes? (yes/no): ").strip().lower()
         if apply == 'yes':
-            tool.apply_changes()
+            tool.apply_changes(args.workers)
             print(f"{Fore.GREEN}\\nAll changes have been applied successfully!{Style.RESET_ALL}")
         else:
             print(f"{Fore.YELLOW}\\nChanges were not applied.{Style.RESET_ALL}")
     else:
         print(f"{Fore.GREEN}\\nNo changes required. All resources are properly tagged.{Style.RESET_ALL}")
 
+    print_run_report(args)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,56 @@
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from aws_services import RunContext, get_service_handler
+from aws_services.client_pool import CLIENT_POOL
+from aws_services.ec2_service import EC2NameIndex
+
+# The account moto creates resources in
+ACCOUNT_ID = '123456789012'
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    """Fake credentials, so no test can reach a real AWS account."""
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_SESSION_TOKEN', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.delenv('AWS_PROFILE', raising=False)
+
+
+def _clear_shared_state():
+    CLIENT_POOL.clear()
+    EC2NameIndex.indexes.clear()
+
+
+@pytest.fixture
+def session():
+    """A us-east-1 session on a fresh moto backend."""
+    with mock_aws():
+        # Clients and EC2 Name indexes are process-wide; start every test from a fresh mock
+        _clear_shared_state()
+        yield boto3.Session(region_name='us-east-1')
+    _clear_shared_state()
+
+
+@pytest.fixture
+def make_handler(session):
+    """Build a service's handler for the moto account, as the tool does."""
+    def make(service_name, region='us-east-1'):
+        handler_session = session if region == session.region_name else boto3.Session(region_name=region)
+        return get_service_handler(service_name, handler_session, RunContext(ACCOUNT_ID, region))
+    return make
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write a tool configuration enabling the given services; returns its path."""
+    def write(*service_names):
+        path = tmp_path / 'config.json'
+        path.write_text(json.dumps(dict.fromkeys(service_names, True)))
+        return str(path)
+    return write
@@ -0,0 +1,74 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from aws_services.accounts import AssumedRoleSessions, list_organization_accounts
+from tagging_tool import OrganizationTaggingTool
+
+TARGET_ACCOUNT = '111111111111'
+DENIED_ACCOUNT = '222222222222'
+
+
+@pytest.fixture
+def assume_role_calls(monkeypatch):
+    """Count AssumeRole calls per account; DENIED_ACCOUNT's role cannot be assumed."""
+    calls = []
+    fetch = AssumedRoleSessions._fetch_credentials
+
+    def fetch_credentials(self):
+        calls.append(self.account_id)
+        if self.account_id == DENIED_ACCOUNT:
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'not authorized'}}, 'AssumeRole')
+        return fetch(self)
+
+    monkeypatch.setattr(AssumedRoleSessions, '_fetch_credentials', fetch_credentials)
+    return calls
+
+
+def test_list_organization_accounts(session):
+    organizations = session.client('organizations')
+    organizations.create_organization(FeatureSet='ALL')
+    created = [organizations.create_account(AccountName=name, Email=f'{name}@example.com')['CreateAccountStatus']
+               for name in ('dev', 'prod')]
+
+    account_ids = list_organization_accounts(session)
+
+    assert len(account_ids) == 3
+    assert {status['AccountId'] for status in created} <= set(account_ids)
+
+
+def test_role_is_assumed_once_on_first_call(session, assume_role_calls):
+    sts = session.client('sts')
+    assumed = AssumedRoleSessions(sts, TARGET_ACCOUNT, 'OrganizationAccountAccessRole')
+
+    sessions = [assumed.session('us-east-1'), assumed.session('eu-west-1')]
+    assert assume_role_calls == []
+
+    identities = [session.client('sts').get_caller_identity() for session in sessions]
+    assert assume_role_calls == [TARGET_ACCOUNT]
+    assert {identity['Account'] for identity in identities} == {TARGET_ACCOUNT}
+    assert 'OrganizationAccountAccessRole' in identities[0]['Arn']
+
+
+def test_sessions_are_created_when_role_is_denied(session, assume_role_calls):
+    assumed = AssumedRoleSessions(session.client('sts'), DENIED_ACCOUNT, 'OrganizationAccountAccessRole').session()
+
+    with pytest.raises(ClientError, match='not authorized'):
+        assumed.client('sts').get_caller_identity()
+
+
+def test_account_where_role_is_denied_is_skipped(session, config_file, assume_role_calls, capsys):
+    credentials = session.client('sts').assume_role(
+        RoleArn=f'arn:aws:iam::{TARGET_ACCOUNT}:role/setup', RoleSessionName='setup')['Credentials']
+    session.client('sqs', aws_access_key_id=credentials['AccessKeyId'],
+                 aws_secret_access_key=credentials['SecretAccessKey'],
+                 aws_session_token=credentials['SessionToken']).create_queue(QueueName='queue')
+
+    tool = OrganizationTaggingTool(config_file('sqs'), account_ids=[DENIED_ACCOUNT, TARGET_ACCOUNT], account_workers=2)
+    assert assume_role_calls == []
+    tool.process_resources()
+
+    assert sorted(assume_role_calls) == sorted([DENIED_ACCOUNT, TARGET_ACCOUNT])
+    assert f'Skipping account {DENIED_ACCOUNT}' in capsys.readouterr().out
+    assert not tool.tools[DENIED_ACCOUNT].changes
+    assert [resource_id for _, resource_id, _, _, _ in tool.tools[TARGET_ACCOUNT].changes] == [
+        f'arn:aws:sqs:us-east-1:{TARGET_ACCOUNT}:queue']
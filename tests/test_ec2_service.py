@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.fixture
+def ec2(session):
+    return session.client('ec2')
+
+
+def run_instances(ec2, count):
+    image_id = ec2.describe_images()['Images'][0]['ImageId']
+    instances = ec2.run_instances(ImageId=image_id, MinCount=count, MaxCount=count)['Instances']
+    return [instance['InstanceId'] for instance in instances]
+
+
+def describe_tags_filters(handler):
+    """Record the Filters of every describe_tags call the handler's client makes."""
+    calls = []
+    handler.client.meta.events.register(
+        'provide-client-params.ec2.DescribeTags',
+        lambda params, **kwargs: calls.append({f['Name']: f['Values'] for f in params.get('Filters', [])}))
+    return calls
+
+
+def names(ec2, instance_ids):
+    tags = ec2.describe_tags(Filters=[{'Name': 'resource-id', 'Values': instance_ids},
+                                      {'Name': 'key', 'Values': ['Name']}])['Tags']
+    return {tag['ResourceId']: tag['Value'] for tag in tags}
+
+
+def test_name_set_after_scan_is_not_overwritten(ec2, make_handler):
+    renamed, untouched = run_instances(ec2, 2)
+    handler = make_handler('ec2')
+    changes = [entry for entry, needs_change in handler.iter_changes() if needs_change]
+    assert len(changes) == 2
+
+    # Named by someone else between the scan (and its Name index sweep) and the apply
+    ec2.create_tags(Resources=[renamed], Tags=[{'Key': 'Name', 'Value': 'web'}])
+    results = handler.apply_tags_batch([(resource_id, {'Name': name}) for _, resource_id, _, name in changes])
+
+    assert results == {renamed: True, untouched: True}
+    assert names(ec2, [renamed, untouched]) == {renamed: 'web', untouched: f'ec2-{untouched}'}
+
+
+def test_apply_checks_only_the_written_ids(ec2, make_handler):
+    instance_ids = run_instances(ec2, 3)
+    handler = make_handler('ec2')
+    calls = describe_tags_filters(handler)
+
+    handler.apply_tags_batch([(instance_id, {'Name': f'ec2-{instance_id}'}) for instance_id in instance_ids[:2]])
+
+    assert calls == [{'resource-id': instance_ids[:2], 'key': ['Name']}]
+    assert set(names(ec2, instance_ids)) == set(instance_ids[:2])
+
+
+def test_scan_reads_names_from_one_sweep(ec2, make_handler):
+    named, unnamed = run_instances(ec2, 2)
+    ec2.create_tags(Resources=[named], Tags=[{'Key': 'Name', 'Value': 'db'}])
+    handler = make_handler('ec2')
+    calls = describe_tags_filters(handler)
+
+    resources = {resource_id: (name, tags) for resource_id, name, tags in handler.iter_resources()}
+
+    assert resources == {named: ('db', {'Name': 'db'}), unnamed: (f'ec2-{unnamed}', {})}
+    assert len(calls) == 1 and 'resource-id' not in calls[0]
@@ -0,0 +1,30 @@
+import pytest
+
+ARN = 'arn:aws:eks:us-east-1:123456789012:cluster/platform'
+
+
+@pytest.fixture
+def eks_handler(session, make_handler):
+    """The EKS handler of an account with one cluster, and the EKS operations it calls."""
+    session.client('eks').create_cluster(name='platform', roleArn='arn:aws:iam::123456789012:role/eks',
+                                         resourcesVpcConfig={'subnetIds': []}, tags={'team': 'platform'})
+    handler = make_handler('eks')
+    calls = []
+    handler.client.meta.events.register('before-call.eks.*', lambda model, **kwargs: calls.append(model.name))
+    return handler, calls
+
+
+def test_clusters_are_described_once_without_tag_index(eks_handler):
+    handler, calls = eks_handler
+
+    assert list(handler.iter_resources()) == [(ARN, 'platform', {'team': 'platform'})]
+    # describe_cluster returns the tags: no list_tags_for_resource on top of it
+    assert calls == ['ListClusters', 'DescribeCluster']
+
+
+def test_built_arn_is_used_with_tag_index(eks_handler):
+    handler, calls = eks_handler
+    handler.tag_index = {ARN: {'team': 'platform'}}
+
+    assert list(handler.iter_resources()) == [(ARN, 'platform', {'team': 'platform'})]
+    assert calls == ['ListClusters']
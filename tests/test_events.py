@@ -0,0 +1,180 @@
+import json
+import pathlib
+
+import pytest
+
+from aws_services import RunContext
+from aws_services.events import FileEventSource, SQSEventSource, created_resources
+from tagging_tool import AWSTaggingTool
+
+ACCOUNT = '123456789012'
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'events'
+
+
+def load_event(name):
+    return json.loads((FIXTURES / f'{name}.json').read_text())
+
+
+# {fixture: created_resources(event, context) for the us-east-1 context of ACCOUNT}
+EXPECTED_RESOURCES = {
+    'lambda_create_function': [
+        ('lambda', 'us-east-1', (f'arn:aws:lambda:us-east-1:{ACCOUNT}:function:orders-api', 'orders-api',
+                                 {'team': 'orders'}))],
+    's3_create_bucket': [('s3', 'us-east-1', ('orders-artifacts', 'orders-artifacts', {}))],
+    'ec2_run_instances': [
+        ('ec2', 'us-east-1', ('i-0aaaaaaaaaaaaaaa1', 'ec2-i-0aaaaaaaaaaaaaaa1', {})),
+        ('ec2', 'us-east-1', ('i-0aaaaaaaaaaaaaaa2', 'ec2-i-0aaaaaaaaaaaaaaa2', {}))],
+    # Only the instance's tag specification counts, not the volume's
+    'ec2_run_instances_named': [
+        ('ec2', 'us-east-1', ('i-0bbbbbbbbbbbbbbb1', 'bastion', {'Name': 'bastion', 'env': 'prod'}))],
+    # The ARN is built for the event's region, not the context's
+    'logs_create_log_group': [
+        ('cloudwatch', 'eu-west-1', (f'arn:aws:logs:eu-west-1:{ACCOUNT}:log-group:/aws/lambda/orders-api',
+                                     '/aws/lambda/orders-api', {}))],
+    'sqs_create_queue': [
+        ('sqs', 'us-east-1', (f'arn:aws:sqs:us-east-1:{ACCOUNT}:orders-dlq', 'orders-dlq', {'team': 'orders'}))],
+    'dynamodb_create_table': [
+        ('dynamodb', 'us-east-1', (f'arn:aws:dynamodb:us-east-1:{ACCOUNT}:table/orders', 'orders',
+                                   {'team': 'orders'}))],
+    'sns_create_topic': [
+        ('sns', 'us-east-1', (f'arn:aws:sns:us-east-1:{ACCOUNT}:orders-events', 'orders-events',
+                              {'Name': 'orders-events'}))],
+    'sqs_create_queue_other_account': [],
+    's3_create_bucket_denied': [],
+    's3_put_bucket_policy': [],
+}
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED_RESOURCES))
+def test_created_resources(name):
+    context = RunContext(ACCOUNT, 'us-east-1')
+    assert created_resources(load_event(name), context) == EXPECTED_RESOURCES[name]
+
+
+def test_created_resources_from_bare_cloudtrail_record():
+    record = load_event('sqs_create_queue')['detail']
+    assert created_resources(record, RunContext(ACCOUNT, 'us-east-1')) == EXPECTED_RESOURCES['sqs_create_queue']
+
+
+def test_created_resources_missing_fields():
+    event = load_event('sqs_create_queue')
+    event['detail']['responseElements'] = None
+    assert created_resources(event, RunContext(ACCOUNT, 'us-east-1')) == []
+
+
+def test_file_source_tails_the_file(tmp_path, capsys):
+    path = tmp_path / 'events.jsonl'
+    first, second = load_event('s3_create_bucket'), load_event('sns_create_topic')
+    path.write_text(json.dumps(first) + '\n' + 'not json\n\n')
+    source = FileEventSource(str(path), poll_interval=0.01)
+    try:
+        assert source.receive() == [(first, None)]
+        assert 'Skipping invalid event on line 2' in capsys.readouterr().out
+
+        # A line being written is only parsed once it is complete
+        line = json.dumps(second)
+        with open(path, 'a') as f:
+            f.write(line[:40])
+        assert source.receive() == []
+        with open(path, 'a') as f:
+            f.write(line[40:] + '\n')
+        assert source.receive(wait_time=1) == [(second, None)]
+        assert source.line_number == 4
+    finally:
+        source.close()
+
+
+@pytest.fixture
+def sqs(session):
+    return session.client('sqs')
+
+
+def queue_messages(sqs, queue_url):
+    attributes = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['All'])['Attributes']
+    return int(attributes['ApproximateNumberOfMessages']) + int(attributes['ApproximateNumberOfMessagesNotVisible'])
+
+
+def test_sqs_source_unwraps_sns_and_acks(sqs):
+    queue_url = sqs.create_queue(QueueName='events')['QueueUrl']
+    event = load_event('sns_create_topic')
+    sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(event))
+    sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(
+        {'Type': 'Notification', 'TopicArn': f'arn:aws:sns:us-east-1:{ACCOUNT}:events', 'Message': json.dumps(event)}))
+    sqs.send_message(QueueUrl=queue_url, MessageBody='not json')
+    source = SQSEventSource(sqs, queue_url, wait_time=0)
+
+    received = source.receive()
+
+    events = [received_event for received_event, _ in received]
+    assert len(events) == 3
+    assert events.count(event) == 2
+    # Not an event, but received so it can be acknowledged
+    assert events.count(None) == 1
+    source.ack([receipt for _, receipt in received])
+    assert queue_messages(sqs, queue_url) == 0
+
+
+@pytest.fixture
+def daemon(sqs, config_file):
+    """A tool tagging SQS queues, the event queue it reads, and the queue its events created."""
+    tool = AWSTaggingTool(config_file('sqs'))
+    tool.event_batch_window = 0
+    events_url = sqs.create_queue(QueueName='events')['QueueUrl']
+    created_url = sqs.create_queue(QueueName='orders-dlq', tags={'team': 'orders'})['QueueUrl']
+    sqs.send_message(QueueUrl=events_url, MessageBody=json.dumps(load_event('sqs_create_queue')))
+    sqs.send_message(QueueUrl=events_url, MessageBody=json.dumps(load_event('s3_create_bucket_denied')))
+    return tool, SQSEventSource(sqs, events_url, wait_time=0), created_url
+
+
+def test_process_events_tags_and_acks(sqs, daemon):
+    tool, source, created_url = daemon
+
+    assert tool.process_events(source, drain=True) == 2
+
+    assert sqs.list_queue_tags(QueueUrl=created_url)['Tags'] == {'team': 'orders', 'Name': 'orders-dlq'}
+    assert queue_messages(sqs, source.queue_url) == 0
+
+
+def test_events_are_kept_when_apply_fails(sqs, daemon, monkeypatch):
+    tool, source, created_url = daemon
+
+    def apply_changes():
+        raise RuntimeError('interrupted')
+
+    monkeypatch.setattr(tool, 'apply_changes', apply_changes)
+    with pytest.raises(RuntimeError):
+        tool.process_events(source, drain=True)
+
+    assert queue_messages(sqs, source.queue_url) == 2
+    assert 'Name' not in sqs.list_queue_tags(QueueUrl=created_url).get('Tags', {})
+
+
+def test_events_are_kept_when_tagging_fails(sqs, daemon):
+    tool, source, _ = daemon
+    # Not found yet when the event is handled, as happens just after creation
+    event = load_event('sqs_create_queue')
+    event['detail']['responseElements']['queueUrl'] = f'https://sqs.us-east-1.amazonaws.com/{ACCOUNT}/orders-late'
+    sqs.send_message(QueueUrl=source.queue_url, MessageBody=json.dumps(event))
+
+    assert tool.process_events(source, drain=True) == 2
+
+    assert queue_messages(sqs, source.queue_url) == 1
+    assert ('sqs', f'arn:aws:sqs:us-east-1:{ACCOUNT}:orders-late') not in tool.recent_events
+
+    # Delivered again once the visibility timeout expires
+    late_url = sqs.create_queue(QueueName='orders-late')['QueueUrl']
+    sqs.send_message(QueueUrl=source.queue_url, MessageBody=json.dumps(event))
+    assert tool.process_events(source, drain=True) == 1
+    assert sqs.list_queue_tags(QueueUrl=late_url)['Tags'] == {'Name': 'orders-late'}
+
+
+def test_redelivered_events_are_acked_without_changes(sqs, daemon):
+    tool, source, created_url = daemon
+    tool.process_events(source, drain=True)
+
+    # SQS delivers at least once: the same event can come back after it was handled
+    sqs.send_message(QueueUrl=source.queue_url, MessageBody=json.dumps(load_event('sqs_create_queue')))
+    assert tool.process_events(source, drain=True) == 1
+
+    assert not tool.changes
+    assert queue_messages(sqs, source.queue_url) == 0
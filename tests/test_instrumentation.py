@@ -0,0 +1,43 @@
+import pytest
+
+from aws_services.instrumentation import API_STATS, ApiCallStats
+from tagging_tool import AWSTaggingTool
+
+
+def stats_of(latencies_ms):
+    stats = ApiCallStats()
+    for latency_ms in latencies_ms:
+        stats.record(latency_ms, 1, None, 200)
+    return stats
+
+
+def test_percentiles_are_interpolated_within_the_first_bucket():
+    stats = stats_of([0.05, 0.08, 0.1, 0.12, 0.36])
+
+    # Not the bucket's upper bound (or max_ms) for every percentile
+    assert stats.percentile(0.5) == 0.18
+    assert stats.percentile(0.95) == pytest.approx(0.34)
+    assert stats.percentile(1.0) == 0.36
+
+
+def test_percentiles_are_interpolated_across_buckets():
+    stats = stats_of([5] * 50 + [30] * 45 + [300] * 5)
+
+    assert stats.percentile(0.5) == 10.0
+    assert stats.percentile(0.95) == 50.0
+    assert stats.percentile(0.99) == 290.0
+    assert stats_of([]).percentile(0.5) == 0.0
+
+
+@pytest.fixture
+def api_stats(monkeypatch):
+    monkeypatch.setattr(API_STATS, 'enabled', True)
+    monkeypatch.setattr(API_STATS, 'stats', {})
+    return API_STATS
+
+
+def test_tool_sts_calls_are_counted(api_stats, session, config_file):
+    AWSTaggingTool(config_file()).get_caller_identity()
+
+    assert [(row['phase'], row['handler'], row['api'], row['calls']) for row in api_stats.report()] == [
+        ('setup', 'tool', 'sts.GetCallerIdentity', 1)]
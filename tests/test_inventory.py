@@ -0,0 +1,19 @@
+from aws_services.inventory import InventoryCache
+from tagging_tool import AWSTaggingTool
+
+
+def test_name_set_after_cached_scan_is_not_overwritten(session, config_file, tmp_path, capsys):
+    sqs = session.client('sqs')
+    queue_url = sqs.create_queue(QueueName='orders')['QueueUrl']
+    inventory = InventoryCache(str(tmp_path / 'inventory.sqlite3'), 900)
+    AWSTaggingTool(config_file('sqs'), inventory=inventory).process_resources()
+
+    # Named by someone else after the scan that filled the cache
+    sqs.tag_queue(QueueUrl=queue_url, Tags={'Name': 'payments'})
+    tool = AWSTaggingTool(config_file('sqs'), inventory=inventory)
+    tool.process_resources()
+    assert 'Using cached sqs inventory' in capsys.readouterr().out
+    assert len(tool.changes) == 1
+    tool.apply_changes()
+
+    assert sqs.list_queue_tags(QueueUrl=queue_url)['Tags'] == {'Name': 'payments'}
@@ -0,0 +1,90 @@
+import pytest
+
+from aws_services.changeset import ChangeSet
+from aws_services.journal import ApplyJournal
+
+ACCOUNT = '123456789012'
+
+
+def make_changes(count):
+    changes = ChangeSet()
+    for index in range(count):
+        changes.add('SQS', f'arn:aws:sqs:us-east-1:{ACCOUNT}:q-{index}', 'Name', f'q-{index}', 'us-east-1')
+    return changes
+
+
+def pending_ids(journal):
+    plan, applied = journal.pending()
+    resource_ids = [resource_id for changes in plan.values() for _, resource_id, _, _, _ in changes]
+    return sorted(resource_id.rsplit(':', 1)[1] for resource_id in resource_ids), applied
+
+
+def record(journal, index, outcome):
+    journal.record(ACCOUNT, 'us-east-1', 'sqs', f'arn:aws:sqs:us-east-1:{ACCOUNT}:q-{index}', 'Name',
+                   f'q-{index}', outcome)
+
+
+def test_pending_skips_applied_changes(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = ApplyJournal(path)
+    journal.add(ACCOUNT, make_changes(4))
+    record(journal, 0, 'applied')
+    record(journal, 1, 'failed')
+    record(journal, 2, 'skipped')
+    journal.close()
+
+    reopened = ApplyJournal(path)
+    assert pending_ids(reopened) == (['q-1', 'q-2', 'q-3'], 1)
+    reopened.close()
+
+
+def test_last_outcome_wins(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = ApplyJournal(path)
+    journal.add(ACCOUNT, make_changes(1))
+    record(journal, 0, 'failed')
+    record(journal, 0, 'applied')
+    journal.close()
+
+    assert pending_ids(ApplyJournal(path)) == ([], 1)
+
+
+def test_crash_then_resume_twice(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = ApplyJournal(path)
+    journal.add(ACCOUNT, make_changes(4))
+    record(journal, 0, 'applied')
+    journal.close()
+    # The crash happened in the middle of writing q-1's outcome
+    with open(path, 'a') as f:
+        f.write('["o",1,"appl')
+
+    first_resume = ApplyJournal(path)
+    assert pending_ids(first_resume) == (['q-1', 'q-2', 'q-3'], 1)
+    record(first_resume, 1, 'applied')
+    record(first_resume, 2, 'applied')
+    first_resume.close()
+
+    second_resume = ApplyJournal(path)
+    assert pending_ids(second_resume) == (['q-3'], 3)
+    second_resume.close()
+    with open(path) as f:
+        assert all(line.endswith('\n') for line in f)
+
+
+def test_crash_before_first_newline(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    path.write_text('["c",0,"1234')
+
+    journal = ApplyJournal(str(path))
+    assert pending_ids(journal) == ([], 0)
+    journal.close()
+    assert path.read_text() == ''
+
+
+def test_invalid_complete_line_is_an_error(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    path.write_text('["x",0]\n')
+
+    with pytest.raises(ValueError, match='invalid journal entry'):
+        ApplyJournal(str(path))
@@ -0,0 +1,32 @@
+import threading
+
+from tagging_tool import AWSTaggingTool
+
+
+def test_stream_does_not_hang_when_preview_fails(session, config_file, monkeypatch):
+    sqs = session.client('sqs')
+    for index in range(20):
+        sqs.create_queue(QueueName=f'queue-{index}')
+    tool = AWSTaggingTool(config_file('sqs'), max_workers=1)
+    # One entry per chunk and room for 4 chunks: the scan fills the queue long before it is done
+    tool.stream_chunk_size = 1
+    tool.stream_put_timeout = 0.01
+
+    def group_label(resource_type, region):
+        raise RuntimeError('interrupted')
+
+    monkeypatch.setattr(tool, '_group_label', group_label)
+    errors = []
+
+    def stream():
+        try:
+            tool.stream_resources()
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=stream, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
@@ -0,0 +1,92 @@
+import pytest
+
+from aws_services.tagging_api import TaggingAPIScanner, parse_arn
+from tagging_tool import AWSTaggingTool
+
+ACCOUNT = '123456789012'
+PREFIX = f'us-east-1:{ACCOUNT}'
+
+
+@pytest.mark.parametrize('arn, expected', [
+    (f'arn:aws:lambda:{PREFIX}:function:orders-api',
+     ('lambda', f'arn:aws:lambda:{PREFIX}:function:orders-api', 'orders-api')),
+    (f'arn:aws:ec2:{PREFIX}:instance/i-0abc', ('ec2', 'i-0abc', 'ec2-i-0abc')),
+    (f'arn:aws:ec2:{PREFIX}:vpc/vpc-0abc', ('vpc', 'vpc-0abc', 'vpc-vpc-0abc')),
+    ('arn:aws:s3:::orders-artifacts', ('s3', 'orders-artifacts', 'orders-artifacts')),
+    (f'arn:aws:eks:{PREFIX}:cluster/platform', ('eks', f'arn:aws:eks:{PREFIX}:cluster/platform', 'platform')),
+    (f'arn:aws:elasticloadbalancing:{PREFIX}:loadbalancer/legacy', ('elb', 'classic/legacy', 'legacy')),
+    (f'arn:aws:elasticloadbalancing:{PREFIX}:loadbalancer/app/web/50dc6c495c0c9188',
+     ('elb', f'arn:aws:elasticloadbalancing:{PREFIX}:loadbalancer/app/web/50dc6c495c0c9188', 'web')),
+    (f'arn:aws:elasticloadbalancing:{PREFIX}:loadbalancer/net/edge/73e2d6bc24d8a067',
+     ('elb', f'arn:aws:elasticloadbalancing:{PREFIX}:loadbalancer/net/edge/73e2d6bc24d8a067', 'edge')),
+    (f'arn:aws:elasticloadbalancing:{PREFIX}:targetgroup/web-tg/6d0ecf831eec9f09',
+     ('elb', f'arn:aws:elasticloadbalancing:{PREFIX}:targetgroup/web-tg/6d0ecf831eec9f09', 'web-tg')),
+    (f'arn:aws:es:{PREFIX}:domain/search', ('opensearch', f'arn:aws:es:{PREFIX}:domain/search', 'search')),
+    (f'arn:aws:rds:{PREFIX}:db:orders-db', ('rds', f'arn:aws:rds:{PREFIX}:db:orders-db', 'orders-db')),
+    (f'arn:aws:rds:{PREFIX}:cluster:orders', ('rds', f'arn:aws:rds:{PREFIX}:cluster:orders', 'orders')),
+    (f'arn:aws:dynamodb:{PREFIX}:table/orders', ('dynamodb', f'arn:aws:dynamodb:{PREFIX}:table/orders', 'orders')),
+    (f'arn:aws:sqs:{PREFIX}:orders-dlq', ('sqs', f'arn:aws:sqs:{PREFIX}:orders-dlq', 'orders-dlq')),
+    (f'arn:aws:sns:{PREFIX}:orders-events', ('sns', f'arn:aws:sns:{PREFIX}:orders-events', 'orders-events')),
+    ('arn:aws:apigateway:us-east-1::/restapis/a1b2c3', ('apigateway', 'a1b2c3', 'api-a1b2c3')),
+    (f'arn:aws:cloudwatch:{PREFIX}:alarm:high-cpu',
+     ('cloudwatch', f'arn:aws:cloudwatch:{PREFIX}:alarm:high-cpu', 'high-cpu')),
+    # Log group ARNs come with or without the trailing :*
+    (f'arn:aws:logs:{PREFIX}:log-group:/aws/lambda/orders-api',
+     ('cloudwatch', f'arn:aws:logs:{PREFIX}:log-group:/aws/lambda/orders-api', '/aws/lambda/orders-api')),
+    (f'arn:aws:logs:{PREFIX}:log-group:/aws/lambda/orders-api:*',
+     ('cloudwatch', f'arn:aws:logs:{PREFIX}:log-group:/aws/lambda/orders-api', '/aws/lambda/orders-api')),
+    # Not resources a handler covers
+    (f'arn:aws:lambda:{PREFIX}:function:orders-api:live', None),
+    (f'arn:aws:dynamodb:{PREFIX}:table/orders/stream/2024-05-02T10:15:30.000', None),
+    ('arn:aws:s3:::orders-artifacts/key', None),
+    (f'arn:aws:sns:{PREFIX}:orders-events:0c3f1b8e-2f4a-4a4e-9a7a-000000000000', None),
+    ('arn:aws:apigateway:us-east-1::/restapis/a1b2c3/stages/prod', None),
+    (f'arn:aws:ec2:{PREFIX}:volume/vol-0abc', None),
+    ('not-an-arn', None),
+])
+def test_parse_arn(arn, expected):
+    assert parse_arn(arn) == expected
+
+
+def test_scanner_indexes_tags_by_handler_resource_id(session):
+    session.client('sqs').create_queue(QueueName='orders-dlq', tags={'team': 'orders'})
+    topic_arn = session.client('sns').create_topic(
+        Name='orders-events', Tags=[{'Key': 'Name', 'Value': 'orders-events'}])['TopicArn']
+    table_arn = session.client('dynamodb').create_table(
+        TableName='orders', BillingMode='PAY_PER_REQUEST',
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        Tags=[{'Key': 'team', 'Value': 'orders'}])['TableDescription']['TableArn']
+    session.client('dynamodb').create_table(
+        TableName='untagged', BillingMode='PAY_PER_REQUEST',
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}])
+
+    index = TaggingAPIScanner(session).scan(['sqs', 'sns', 'dynamodb', 'ec2'])
+
+    # EC2 tags come from its describe calls; never-tagged resources are not reported
+    assert index == {
+        'sqs': {f'arn:aws:sqs:us-east-1:{ACCOUNT}:orders-dlq': {'team': 'orders'}},
+        'sns': {topic_arn: {'Name': 'orders-events'}},
+        'dynamodb': {table_arn: {'team': 'orders'}},
+    }
+
+
+def test_scanner_skips_unsupported_services(session):
+    assert TaggingAPIScanner(session).scan(['ec2', 'vpc', 's3']) == {}
+
+
+def test_never_tagged_resources_are_listed_with_tagging_api_backend(session, config_file):
+    sqs = session.client('sqs')
+    sqs.create_queue(QueueName='named', tags={'Name': 'named'})
+    sqs.create_queue(QueueName='tagged', tags={'team': 'orders'})
+    sqs.create_queue(QueueName='never-tagged')
+
+    tool = AWSTaggingTool(config_file('sqs'), scan_backend='tagging-api')
+    tool.process_resources()
+
+    arn = f'arn:aws:sqs:us-east-1:{ACCOUNT}:'
+    assert sorted(resource_id for _, resource_id, _, _, _ in tool.changes) == [f'{arn}never-tagged', f'{arn}tagged']
+    assert [resource_id for _, resource_id, _, _, _ in tool.no_changes] == [f'{arn}named']
+    # The tags came from the index: the never-tagged queue is missing from it
+    assert set(tool.tag_index['us-east-1']['sqs']) == {f'{arn}named', f'{arn}tagged'}